@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Measure how fast each Game of Life updater runs.
+
+Every source accepted by gameoflife.py --source is run on the sample files and on
+random boards, once per surface. Each case runs in a fresh process so peak RSS is
+per case. Run from this directory, external variants are found relative to it.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import resource
+import sys
+import time
+
+import gameoflife
+
+# pylint: disable=missing-function-docstring
+
+SIZES = [64, 256, 1024, 4096]
+STARTUP_SECONDS = 30
+
+
+def make_board(name: str, seed: int) -> gameoflife.Board:
+    if name.startswith("random"):
+        size = int(name[len("random") :])
+        return gameoflife.random_board(size, size, rng=random.Random(seed))
+    with open(name, encoding="utf-8") as boardfile:
+        return gameoflife.parse(boardfile.readlines())
+
+
+def run_case(case: dict, results) -> None:
+    result = dict(case)
+    try:
+        board = make_board(case["board"], case["seed"])
+        result["width"] = max(len(row) for row in board)
+        result["height"] = len(board)
+        update_function = gameoflife.pick_updater(
+            case["source"], case["surface"], workers=case["workers"]
+        )
+        # The first generation includes converting the board into the engine's format
+        start = time.perf_counter()
+        board = update_function(board)
+        elapsed = time.perf_counter() - start
+        generations = 0
+        if elapsed >= case["max_seconds"]:
+            # Too slow to time on its own, report the first generation instead
+            generations = 1
+        else:
+            start = time.perf_counter()
+            elapsed = 0.0
+        while generations < case["generations"] and (
+            generations == 0 or elapsed < case["max_seconds"]
+        ):
+            board = update_function(board)
+            generations += 1
+            elapsed = time.perf_counter() - start
+        # Some sources only simulate part of the board, count what they returned
+        cells = len(board) * max((len(row) for row in board), default=0)
+        result.update(
+            cells=cells,
+            generations=generations,
+            seconds=elapsed,
+            generations_per_second=generations / elapsed,
+            cells_per_second=cells * generations / elapsed,
+        )
+        if hasattr(update_function, "close"):
+            update_function.close()
+    except Exception as error:  # pylint: disable=broad-except
+        result["error"] = repr(error)
+    # Kilobytes on Linux
+    result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_children_rss_kb"] = resource.getrusage(
+        resource.RUSAGE_CHILDREN
+    ).ru_maxrss
+    results.put(result)
+
+
+def run_isolated(case: dict) -> dict:
+    """Run a case in a new process, recording it as an error if the process dies."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_case, args=(case, results))
+    process.start()
+    # Room for making the board, the first generation and the timed ones
+    limit = 2 * case["max_seconds"] + STARTUP_SECONDS
+    deadline = time.monotonic() + limit
+    while True:
+        try:
+            result = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if time.monotonic() > deadline:
+                process.kill()
+                result = dict(case, error=f"timed out after {limit:g}s")
+                break
+            if not process.is_alive():
+                # It may have finished right after the timeout
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    result = dict(case, error=f"exited with code {process.exitcode}")
+                break
+    process.join()
+    return result
+
+
+def key(result: dict) -> tuple:
+    return (result["source"], result["board"], result["surface"], result["workers"])
+
+
+def compare(results: list[dict], baseline_file: str) -> None:
+    with open(baseline_file, encoding="utf-8") as baseline:
+        old = {key(result): result for result in json.load(baseline)["results"]}
+    for result in results:
+        before = old.get(key(result))
+        if not before or "error" in before or "error" in result:
+            continue
+        ratio = result["generations_per_second"] / before["generations_per_second"]
+        print(f"{ratio:6.2f}x", *key(result))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--sources", nargs="+", default=gameoflife.sources)
+    parser.add_argument("--surfaces", nargs="+", default=gameoflife.surfaces)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--samples", default="samples")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=5,
+        help="Stop timing a case after this long, at least one generation is always"
+        " measured. Cases still running at twice this, plus time to start up, are"
+        " stopped and recorded as errors.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", default="benchmark.json")
+    parser.add_argument(
+        "--compare", help="A previous --output file to compare against."
+    )
+    args = parser.parse_args()
+
+    boards = sorted(glob.glob(os.path.join(args.samples, "*.txt")))
+    boards += [f"random{size}" for size in args.sizes]
+    results = []
+    for source in args.sources:
+        for board in boards:
+            for surface in args.surfaces:
+                if source == "hashlife" and surface != "infinite":
+                    continue
+                result = run_isolated(
+                    {
+                        "source": source,
+                        "board": board,
+                        "surface": surface,
+                        "workers": args.workers,
+                        "seed": args.seed,
+                        "generations": args.generations,
+                        "max_seconds": args.max_seconds,
+                    }
+                )
+                results.append(result)
+                if "error" in result:
+                    print(source, board, surface, "failed:", result["error"])
+                else:
+                    print(
+                        f"{source} {board} {surface}: "
+                        f"{result['generations_per_second']:.1f} generations/s, "
+                        f"{result['cells_per_second']:.3g} cells/s, "
+                        f"peak RSS {result['peak_rss_kb']} kB"
+                    )
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(
+            {
+                "python": sys.version,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "time": time.time(),
+                "results": results,
+            },
+            output,
+            indent=2,
+        )
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,20 +2,42 @@
 """The Game of Life."""
 import abc
 import argparse
+import csv
+import hashlib
+import json
+import mmap
 import os
+import queue
 import random
+import re
+import signal
 import string
+import struct
 import subprocess
 import sys
+import threading
 import time
-from typing import Callable, Literal, Optional, TypedDict
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+    TypedDict,
+)
 
 # pylint: disable=missing-class-docstring, missing-function-docstring, invalid-name
 
 Cell = bool
 Row = list[bool]
-Board = list[list[bool]]
 Surface = Literal["sphere", "rectangle", "infinite", "torus", "?"]
+# Indexed by neighbor count, plus 9 if the cell is alive
+Rule = tuple[bool, ...]
 
 LIVE = True
 DEAD = False
@@ -26,6 +48,29 @@ LIVE_STR = "# "
 DEAD_STR = "  "
 LIVE_STR_PRETTY = "█▒"
 DEAD_STR_PRETTY = "  "
+# Two cells per column of a character. Bit 2 * row + column of the index is a cell.
+QUADRANTS = " ▘▝▀▖▌▞▛▗▚▐▜▄▙▟█"
+BRAILLE_DOTS = (0x01, 0x08, 0x02, 0x10, 0x04, 0x20, 0x40, 0x80)
+BRAILLE = "".join(
+    chr(0x2800 + sum(dot for i, dot in enumerate(BRAILLE_DOTS) if n >> i & 1))
+    for n in range(256)
+)
+# Rows of cells per character and the characters
+GLYPHS: dict[str, tuple[int, str]] = {
+    "quadrants": (2, QUADRANTS),
+    "braille": (4, BRAILLE),
+}
+
+
+sources: list[str] = [
+    "python",
+    "numpy",
+    "hashlife",
+    "sparse",
+    "lut",
+    "./variants/golf.py",
+    "./variants/bitwise.py",
+]
 
 
 class OutputArgs(TypedDict, total=False):
@@ -36,7 +81,50 @@ class OutputArgs(TypedDict, total=False):
     pretty: bool
     narrow: bool
     color: str
-    output: Literal["cli", "neopixel"]
+    output: Literal["cli", "neopixel", "neopixel-memory", "video"]
+    record: str
+    scale: int
+    serpentine: bool
+    step_exponent: int
+    workers: int
+    redraw: Literal["diff", "full"]
+    glyphs: Literal["cells", "quadrants", "braille"]
+    # With follow, the cells that fit on the terminal
+    follow: bool
+    screen: tuple[int, int]
+    rule: str
+    stop_after_cycle: int
+    frame_queue: int
+    checkpoint: str
+    checkpoint_interval: float
+    telemetry: "Telemetry"
+    # Set by loop(): the period and the first step of the cycle
+    cycle: tuple[int, int]
+
+
+def parse_rule(rule: str) -> Rule:
+    """Compile a rule like B3/S23, or S/B like 23/3, into a lookup table."""
+    parts = rule.upper().split("/")
+    if len(parts) != 2:
+        raise ValueError(f"rule should look like B3/S23: {rule}")
+    if parts[0].startswith("S") or parts[1].startswith("B"):
+        parts.reverse()
+    elif not parts[0].startswith("B"):
+        # Traditional S/B notation
+        parts = ["B" + parts[1], "S" + parts[0]]
+    birth, survival = parts
+    if not (birth.startswith("B") and survival.startswith("S")):
+        raise ValueError(f"rule should look like B3/S23: {rule}")
+    if not all(count in "012345678" for count in birth[1:] + survival[1:]):
+        raise ValueError(f"neighbor counts should be 0 to 8: {rule}")
+    return tuple(
+        str(count) in (survival[1:] if alive else birth[1:])
+        for alive in (False, True)
+        for count in range(9)
+    )
+
+
+CONWAY = parse_rule("B3/S23")
 
 
 def empty_row() -> Row:
@@ -46,12 +134,155 @@ def empty_row() -> Row:
 surfaces: list[Surface] = ["sphere", "rectangle", "infinite", "torus", "?"]
 
 
+class Board:
+    """Cells packed 8 per byte, each row padded to whole bytes, see pack().
+
+    Indexing gives row views, so board[y][x] reads and writes single cells like a
+    list of lists. Functions taking a Board also accept a list of lists of bools.
+    """
+
+    __slots__ = ("width", "height", "stride", "data")
+
+    def __init__(
+        self, width: int, height: int, data: Optional[bytearray] = None
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.stride = (width + 7) // 8
+        self.data = bytearray(self.stride * height) if data is None else data
+
+    @classmethod
+    def from_rows(cls, rows: "BoardLike") -> "Board":
+        if isinstance(rows, Board):
+            return rows
+        width = max((len(row) for row in rows), default=0)
+        return cls(width, len(rows), bytearray(pack(rows, width)))
+
+    def row_bits(self, y: int) -> int:
+        """Cell x is bit x."""
+        return int.from_bytes(
+            self.data[y * self.stride : (y + 1) * self.stride], "little"
+        )
+
+    def set_row_bits(self, y: int, bits: int) -> None:
+        bits &= (1 << self.width) - 1
+        self.data[y * self.stride : (y + 1) * self.stride] = bits.to_bytes(
+            self.stride, "little"
+        )
+
+    def copy(self) -> "Board":
+        return Board(self.width, self.height, bytearray(self.data))
+
+    def population(self) -> int:
+        return int.from_bytes(self.data, "little").bit_count()
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [BoardRow(self, i) for i in range(*y.indices(self.height))]
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("board index out of range")
+        return BoardRow(self, y)
+
+    def __iter__(self):
+        return (BoardRow(self, y) for y in range(self.height))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Board):
+            return (self.width, self.height, self.data) == (
+                other.width,
+                other.height,
+                other.data,
+            )
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other)
+        )
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"Board({self.width}, {self.height})\n" + show(self, ("#", "."))
+
+
+class BoardRow:
+    """A view of one row of a Board."""
+
+    __slots__ = ("board", "y")
+
+    def __init__(self, board: Board, y: int) -> None:
+        self.board = board
+        self.y = y
+
+    @property
+    def bits(self) -> int:
+        return self.board.row_bits(self.y)
+
+    def __len__(self) -> int:
+        return self.board.width
+
+    def index(self, x: int) -> int:
+        if x < 0:
+            x += self.board.width
+        if not 0 <= x < self.board.width:
+            raise IndexError("row index out of range")
+        return x
+
+    def __getitem__(self, x):
+        if isinstance(x, slice):
+            return list(self)[x]
+        x = self.index(x)
+        return bool(
+            self.board.data[self.y * self.board.stride + (x >> 3)] >> (x & 7) & 1
+        )
+
+    def __setitem__(self, x: int, cell: Cell) -> None:
+        x = self.index(x)
+        i = self.y * self.board.stride + (x >> 3)
+        if cell:
+            self.board.data[i] |= 1 << (x & 7)
+        else:
+            self.board.data[i] &= ~(1 << (x & 7)) & 0xFF
+
+    def __iter__(self):
+        width = self.board.width
+        if width == 0:
+            return iter(())
+        return (bit == "1" for bit in reversed(format(self.bits, f"0{width}b")))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BoardRow):
+            return len(self) == len(other) and self.bits == other.bits
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+BoardLike = Board | list[Row]
+
+
+def is_empty(board: BoardLike) -> bool:
+    if isinstance(board, Board):
+        return not any(board.data)
+    return not any(map(any, board))
+
+
 def ix(row: Row, x: int, default=DEAD) -> Cell:
     return row[x] if 0 <= x < len(row) else default
 
 
 def empty(width: int, height: int) -> Board:
-    return [[DEAD for _ in range(width)] for _ in range(height)]
+    return Board(width, height)
 
 
 def glider(up: bool, left: bool) -> Board:
@@ -65,35 +296,95 @@ def glider(up: bool, left: bool) -> Board:
     if not left:
         for row in out:
             row.reverse()
-    return out
+    return Board.from_rows(out)
+
+
+BITWISE = {
+    bool.__or__: int.__or__,
+    bool.__and__: int.__and__,
+    bool.__xor__: int.__xor__,
+}
+
+
+def add(board: BoardLike, other: BoardLike, operator=bool.__or__) -> Board:
+    """Combine other into a copy of board, cells outside board are dropped."""
+    board = Board.from_rows(board)
+    other = Board.from_rows(other)
+    bitwise = BITWISE.get(operator)
+    if bitwise is None:
+        new = Board(board.width, board.height)
+        for y, row in enumerate(board):
+            other_row = other[y] if y < len(other) else empty_row()
+            for x, cell in enumerate(row):
+                new[y][x] = operator(cell, ix(other_row, x))
+        return new
+    if other.width == board.width:
+        # Same row layout, combine everything at once
+        size = len(board.data)
+        mine = int.from_bytes(board.data, "little")
+        theirs = int.from_bytes(other.data[:size], "little")
+        return Board(
+            board.width,
+            board.height,
+            bytearray(bitwise(mine, theirs).to_bytes(size, "little")),
+        )
+    new = Board(board.width, board.height)
+    for y in range(board.height):
+        theirs = other.row_bits(y) if y < other.height else 0
+        new.set_row_bits(y, bitwise(board.row_bits(y), theirs))
+    return new
 
 
-def add(board: Board, other: Board, operator=bool.__or__) -> Board:
-    new = []
-    for y, row in enumerate(board):
-        new_row = empty_row()
-        other_row = other[y] if y < len(other) else empty_row()
-        for x, cell in enumerate(row):
-            new_row.append(operator(cell, ix(other_row, x)))
-        new.append(new_row)
-    return new
+def stamp(board: Board, pattern: BoardLike, x: int = 0, y: int = 0) -> Board:
+    """Draw the live cells of pattern onto board in place, with its top left at x, y."""
+    pattern = Board.from_rows(pattern)
+    for i in range(max(0, -y), min(pattern.height, board.height - y)):
+        bits = pattern.row_bits(i)
+        bits = bits << x if x >= 0 else bits >> -x
+        board.set_row_bits(y + i, board.row_bits(y + i) | bits)
+    return board
 
 
-def shift(board: Board, y: int = 0, x: int = 0) -> Board:
-    for _ in range(abs(y)):
-        if y > 0:
-            board.insert(0, [DEAD for _ in range(len(board[0]))])
-        if y < 0:
-            board.append([DEAD for _ in range(len(board[-1]))])
-    for row in board:
-        for _ in range(x):
-            if x > 0:
-                row.insert(0, DEAD)
-            if x < 0:
-                row.append(DEAD)
+RANDOM_PRECISION = 16
+
+
+def random_board(
+    width: int, height: int, density: float = 1 / 3, rng: Optional[random.Random] = None
+) -> Board:
+    """Each cell is alive with probability density, rounded to 1 / 2^RANDOM_PRECISION.
+
+    Whole boards of random bits are combined one bit of density at a time, least
+    significant first: OR with random bits for a 1 and AND for a 0.
+    """
+    getrandbits = (rng or random).getrandbits
+    board = empty(width, height)
+    size = len(board.data) * 8
+    threshold = min(
+        max(round(density * (1 << RANDOM_PRECISION)), 0), 1 << RANDOM_PRECISION
+    )
+    if threshold == 1 << RANDOM_PRECISION:
+        cells = (1 << size) - 1
+    else:
+        cells = 0
+        for bit in range(RANDOM_PRECISION):
+            if threshold >> bit & 1:
+                cells |= getrandbits(size)
+            elif cells:
+                cells &= getrandbits(size)
+    # Clear the padding past the end of every row
+    row_mask = ((1 << width) - 1).to_bytes(board.stride, "little")
+    cells &= int.from_bytes(row_mask * height, "little")
+    board.data[:] = cells.to_bytes(len(board.data), "little")
     return board
 
 
+def shift(board: BoardLike, y: int = 0, x: int = 0) -> Board:
+    """A copy with y empty rows above and x empty columns left, below/right if < 0."""
+    board = Board.from_rows(board)
+    shifted = Board(board.width + abs(x), board.height + abs(y))
+    return stamp(shifted, board, max(x, 0), max(y, 0))
+
+
 def neighbors(x: int, row: Row, prev_row: Row, next_row: Row, surface: Surface) -> int:
     """Count living neighbors diagonally, horizontally, and vertically."""
     if surface == "sphere":
@@ -125,83 +416,1318 @@ def neighbors(x: int, row: Row, prev_row: Row, next_row: Row, surface: Surface)
     ].count(LIVE)
 
 
-def update(board: Board, surface: Surface) -> Board:
+def update(board: BoardLike, surface: Surface, rule: Rule = CONWAY) -> Board:
+    # Plain lists are much faster to index cell by cell
+    rows = [list(row) for row in board] if isinstance(board, Board) else board
     new_board = []
     prev_row = empty_row()
     if surface == "sphere":
-        prev_row = board[-1]
-    for y, row in enumerate(board):
-        next_row = board[y + 1] if 0 <= y + 1 < len(board) else empty_row()
-        if surface == "sphere" and y + 1 == len(board):
-            next_row = board[0]
+        prev_row = rows[-1]
+    for y, row in enumerate(rows):
+        next_row = rows[y + 1] if 0 <= y + 1 < len(rows) else empty_row()
+        if surface == "sphere" and y + 1 == len(rows):
+            next_row = rows[0]
         new_row = empty_row()
         for x, cell in enumerate(row):
             neighbor_count = neighbors(x, row, prev_row, next_row, surface)
-            # "normal" RULE B3/S23
-            new_cell = LIVE if neighbor_count == 3 else cell if neighbor_count == 2 else DEAD
-            # RULE B3/S12345
-            # new_cell = LIVE if neighbor_count == 3 else cell if neighbor_count in [1, 2, 3, 4, 5] else DEAD
-            new_row.append(new_cell)
+            new_row.append(rule[neighbor_count + 9 * cell])
         new_board.append(new_row)
         prev_row = row
-    return new_board
-
-
-def show(board: Board, alphabet: tuple[str, str] = (LIVE_STR, DEAD_STR), sep="") -> str:
+    return Board.from_rows(new_board)
+
+
+def bounding_box(board: BoardLike) -> Optional[tuple[int, int, int, int]]:
+    """Left, top, right and bottom of the live cells, inclusive, or None."""
+    board = Board.from_rows(board)
+    rows = [y for y in range(board.height) if board.row_bits(y)]
+    if not rows:
+        return None
+    columns = 0
+    for y in rows:
+        columns |= board.row_bits(y)
+    left = (columns & -columns).bit_length() - 1
+    return left, rows[0], columns.bit_length() - 1, rows[-1]
+
+
+def crop(board: BoardLike, x: int, y: int, width: int, height: int) -> Board:
+    board = Board.from_rows(board)
+    window = Board(width, height)
+    for i in range(max(0, -y), min(height, board.height - y)):
+        bits = board.row_bits(y + i)
+        window.set_row_bits(i, bits >> x if x >= 0 else bits << -x)
+    return window
+
+
+# The 2-cell pairs in each byte of a row, moved to where row i of a character goes
+GLYPH_PAIRS = [
+    [
+        tuple((byte >> shift & 3) << 2 * i for shift in (0, 2, 4, 6))
+        for byte in range(256)
+    ]
+    for i in range(4)
+]
+
+
+def show_glyphs(board: BoardLike, glyphs: str) -> list[str]:
+    """Lines of characters that each show 2 cells across and 2 or 4 down."""
+    board = Board.from_rows(board)
+    rows_per_char, table = GLYPHS[glyphs]
+    columns = (board.width + 1) // 2
+    blank = [0] * (board.stride * 4)
+    lines = []
+    for top in range(0, board.height, rows_per_char):
+        rows = []
+        for i in range(rows_per_char):
+            y = top + i
+            if y < board.height:
+                pairs = GLYPH_PAIRS[i]
+                row = board.data[y * board.stride : (y + 1) * board.stride]
+                rows.append([pair for byte in row for pair in pairs[byte]])
+            else:
+                rows.append(blank)
+        lines.append("".join([table[sum(cell)] for cell in zip(*rows)][:columns]))
+    return lines
+
+
+def show(
+    board: BoardLike, alphabet: tuple[str, str] = (LIVE_STR, DEAD_STR), sep=""
+) -> str:
     live, dead = alphabet
+    if isinstance(board, Board) and not sep and board.width:
+        glyphs = {ord("0"): dead, ord("1"): live}
+        return "\n".join(
+            format(board.row_bits(y), f"0{board.width}b")[::-1].translate(glyphs)
+            for y in range(board.height)
+        )
     return "\n".join(sep.join(live if cell else dead for cell in row) for row in board)
 
 
 def parse(lines: list[str], live: str = "#@&" + string.ascii_uppercase) -> Board:
-    output: Board = []
+    output: list[Row] = []
     for row in lines:
         row = row.strip()
         if len(row) == 0:
             continue
         output.append([LIVE if cell in live else DEAD for cell in row])
-    assert len(output) > 0, f"empty board parsed:\n{lines}"
-    assert all(len(row) > 0 for row in output), f"empty rows found:\n{lines}"
-    return output
+    if not output:
+        raise ValueError("empty board")
+    return Board.from_rows(output)
+
+
+RLE_HEADER = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)")
+RLE_TOKEN = re.compile(r"(\d*)([^\d\s])")
+# Plaintext .cells: "." dead, anything else alive
+CELLS_LIVE = re.compile(r"[^.]")
+
+
+def parse_rle(lines: Iterable[str]) -> tuple[int, int, bytearray]:
+    """Decode run length encoded lines straight into packed rows, see pack()."""
+    width = height = 0
+    data = bytearray()
+    stride = 0
+    x = y = 0
+    row = 0
+    count = ""
+    header = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if y >= height and stride:
+            break
+        if not stride:
+            header = RLE_HEADER.match(line)
+            if not header:
+                raise ValueError(f"RLE header missing: {line}")
+            width, height = int(header.group(1)), int(header.group(2))
+            stride = (width + 7) // 8
+            data = bytearray(stride * height)
+            continue
+        for token in RLE_TOKEN.finditer(count + line):
+            run = int(token.group(1) or 1)
+            tag = token.group(2)
+            if tag in "$!":
+                if y < height:
+                    row &= (1 << width) - 1
+                    data[y * stride : (y + 1) * stride] = row.to_bytes(stride, "little")
+                y = height if tag == "!" else y + run
+                x = row = 0
+                continue
+            elif tag in "b.":
+                x += run
+            else:
+                row |= ((1 << run) - 1) << x
+                x += run
+        # A run count may continue on the next line
+        trailing = re.search(r"\d+$", line)
+        count = trailing.group(0) if trailing else ""
+    if header is None:
+        raise ValueError("RLE header missing")
+    if y < height:
+        row &= (1 << width) - 1
+        data[y * stride : (y + 1) * stride] = row.to_bytes(stride, "little")
+    return width, height, data
+
+
+def parse_cells(lines: Iterable[str]) -> tuple[int, int, bytearray]:
+    """Decode plaintext .cells lines into packed rows, see pack()."""
+    rows = []
+    width = 0
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.startswith("!"):
+            continue
+        width = max(width, len(line))
+        bits = CELLS_LIVE.sub("1", line).replace(".", "0")
+        rows.append(int(bits[::-1] or "0", 2))
+    stride = (width + 7) // 8
+    return (
+        width,
+        len(rows),
+        bytearray(b"".join(row.to_bytes(stride, "little") for row in rows)),
+    )
+
+
+def read_pattern(path: str) -> Board:
+    """Read a board from a .rle, .cells or this project's own format."""
+    with open(path, encoding="utf-8") as boardfile:
+        if path.endswith(".rle"):
+            return unpack(*parse_rle(boardfile))
+        if path.endswith(".cells"):
+            return unpack(*parse_cells(boardfile))
+        return parse(boardfile.readlines())
+
+
+CYCLE_HISTORY = 1024
+
+
+def fingerprint(board: BoardLike) -> int:
+    """A 64-bit hash that is the same across runs, so it can be saved."""
+    if not isinstance(board, Board):
+        board = Board.from_rows(board)
+    digest = hashlib.blake2b(
+        board.data, digest_size=8, salt=struct.pack("<Q", board.width)
+    )
+    return int.from_bytes(digest.digest(), "little")
+
+
+class CycleDetector:
+    """Remember hashes of the last CYCLE_HISTORY boards to find repeating states."""
+
+    def __init__(self, history: int = CYCLE_HISTORY) -> None:
+        self.history = history
+        self.seen: dict[int, int] = {}
+        self.order: deque[int] = deque()
+
+    def check(self, board: Board, iteration: int) -> Optional[tuple[int, int]]:
+        """The period and first step of the cycle, if this board was seen before."""
+        if is_empty(board):
+            # The empty board is its own successor
+            return 1, iteration
+        key = fingerprint(board)
+        if key in self.seen:
+            start = self.seen[key]
+            return iteration - start, start
+        self.seen[key] = iteration
+        self.order.append(key)
+        if len(self.order) > self.history:
+            del self.seen[self.order.popleft()]
+        return None
+
+
+# Snapshot files, all little-endian:
+# magic, version, surface index, width, height, generation, cycle period and start
+# (period 0 if no cycle was found), rule length, number of cycle history entries.
+# Followed by the rule string, the history as (fingerprint, generation) pairs
+# oldest first, and the board as rows of ceil(width / 8) bytes like pack().
+SNAPSHOT_HEADER = struct.Struct("<4sHHIIQQQHI")
+SNAPSHOT_ENTRY = struct.Struct("<QQ")
+SNAPSHOT_MAGIC = b"GOLS"
+SNAPSHOT_VERSION = 1
+
+
+class Snapshot(TypedDict):
+    board: Board
+    surface: Surface
+    rule: str
+    generation: int
+    detector: CycleDetector
+    cycle: Optional[tuple[int, int]]
+
+
+def dump_snapshot(snapshot: Snapshot) -> bytes:
+    board = snapshot["board"]
+    if not isinstance(board, Board):
+        board = Board.from_rows(board)
+    detector = snapshot["detector"]
+    period, start = snapshot["cycle"] or (0, 0)
+    rule = snapshot["rule"].encode("ascii")
+    return b"".join(
+        [
+            SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                surfaces.index(snapshot["surface"]),
+                board.width,
+                board.height,
+                snapshot["generation"],
+                period,
+                start,
+                len(rule),
+                len(detector.order),
+            ),
+            rule,
+            *(SNAPSHOT_ENTRY.pack(key, detector.seen[key]) for key in detector.order),
+            board.data,
+        ]
+    )
+
+
+def load_snapshot(path: str) -> Snapshot:
+    """Read a snapshot through a memory map, the board rows are copied once."""
+    with open(path, "rb") as snapshot_file, mmap.mmap(
+        snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as view:
+        if len(view) < SNAPSHOT_HEADER.size:
+            raise ValueError(f"{path} is not a Game of Life snapshot")
+        (
+            magic,
+            version,
+            surface,
+            width,
+            height,
+            generation,
+            period,
+            start,
+            rule_length,
+            entries,
+        ) = SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a Game of Life snapshot")
+        if surface >= len(surfaces):
+            raise ValueError(f"{path} has an unknown surface {surface}")
+        offset = SNAPSHOT_HEADER.size
+        size = (width + 7) // 8 * height
+        if len(view) != offset + rule_length + entries * SNAPSHOT_ENTRY.size + size:
+            raise ValueError(f"{path} is truncated")
+        rule = view[offset : offset + rule_length].decode("ascii")
+        # Raises ValueError if the rule is corrupt
+        parse_rule(rule)
+        offset += rule_length
+        detector = CycleDetector()
+        for key, iteration in SNAPSHOT_ENTRY.iter_unpack(
+            view[offset : offset + entries * SNAPSHOT_ENTRY.size]
+        ):
+            detector.seen[key] = iteration
+            detector.order.append(key)
+        offset += entries * SNAPSHOT_ENTRY.size
+        with memoryview(view) as whole, whole[offset:] as rows:
+            data = bytearray(rows)
+    return {
+        "board": Board(width, height, data),
+        "surface": surfaces[surface],
+        "rule": rule,
+        "generation": generation,
+        "detector": detector,
+        "cycle": (period, start) if period else None,
+    }
+
+
+def write_atomically(path: str, data: bytes) -> None:
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as output:
+        output.write(data)
+        output.flush()
+        os.fsync(output.fileno())
+    os.replace(temporary, path)
+
+
+class Checkpoint:
+    """Write snapshots to a file every interval seconds from a background thread.
+
+    The board is serialized in the caller's thread, the file is written in another.
+    If the previous write hasn't finished, the snapshot is skipped.
+    """
+
+    def __init__(self, path: str, interval: float) -> None:
+        self.path = path
+        self.interval = interval
+        self.last_save = time.monotonic()
+        self.writer: Optional[threading.Thread] = None
+
+    def due(self) -> bool:
+        return time.monotonic() - self.last_save >= self.interval
+
+    def save(self, snapshot: Snapshot, wait: bool = False) -> None:
+        if self.writer and self.writer.is_alive():
+            if not wait:
+                return
+            self.writer.join()
+        data = dump_snapshot(snapshot)
+        self.last_save = time.monotonic()
+        self.writer = threading.Thread(target=write_atomically, args=(self.path, data))
+        self.writer.start()
+        if wait:
+            self.writer.join()
+
+    def discard(self) -> None:
+        """Remove the snapshot of a run that finished, so the next run starts fresh."""
+        if self.writer:
+            self.writer.join()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+TELEMETRY_HISTORY = 100
+
+
+class Metrics(TypedDict):
+    iteration: int
+    population: int
+    births: int
+    deaths: int
+    # Bounding box of the live cells, inclusive, None on an empty board
+    left: Optional[int]
+    top: Optional[int]
+    right: Optional[int]
+    bottom: Optional[int]
+    update_seconds: float
+    render_seconds: Optional[float]
+    bytes_written: Optional[int]
+
+
+def measure(
+    previous: Optional[BoardLike], board: BoardLike
+) -> tuple[int, int, int, tuple]:
+    """Population, births, deaths and bounding box (left, top, right, bottom)."""
+    board = Board.from_rows(board)
+    cells = int.from_bytes(board.data, "little")
+    population = cells.bit_count()
+    if previous is None:
+        births, deaths = population, 0
+    else:
+        previous = Board.from_rows(previous)
+        before = int.from_bytes(previous.data, "little")
+        if (previous.width, previous.height) != (board.width, board.height):
+            before = 0
+        births = (cells & ~before).bit_count()
+        deaths = (before & ~cells).bit_count()
+    return population, births, deaths, bounding_box(board) or (None, None, None, None)
+
+
+class Telemetry:
+    """Per-generation metrics, the last TELEMETRY_HISTORY kept in a ring buffer.
+
+    Steps are recorded by the simulation and completed when their frame is drawn
+    or dropped, which may happen in another thread. Completed records go to the
+    sink, a .csv file or JSON lines. Steps that were never drawn are written
+    without timings on close().
+    """
+
+    fields = list(Metrics.__annotations__)
+
+    def __init__(
+        self, path: Optional[str] = None, history: int = TELEMETRY_HISTORY
+    ) -> None:
+        self.records: deque[Metrics] = deque(maxlen=history)
+        # Recorded but not drawn yet, at most the frames queued ahead of the display
+        self.pending: dict[int, Metrics] = {}
+        self.lock = threading.Lock()
+        self.previous: Optional[Board] = None
+        self.sink = open(path, "w", encoding="utf-8", newline="") if path else None
+        self.csv = None
+        if self.sink and path and path.endswith(".csv"):
+            self.csv = csv.DictWriter(self.sink, self.fields)
+            self.csv.writeheader()
+
+    def step(self, iteration: int, board: Board, seconds: float) -> None:
+        population, births, deaths, (left, top, right, bottom) = measure(
+            self.previous, board
+        )
+        self.previous = board
+        record: Metrics = {
+            "iteration": iteration,
+            "population": population,
+            "births": births,
+            "deaths": deaths,
+            "left": left,
+            "top": top,
+            "right": right,
+            "bottom": bottom,
+            "update_seconds": seconds,
+            "render_seconds": None,
+            "bytes_written": None,
+        }
+        with self.lock:
+            self.records.append(record)
+            self.pending[iteration] = record
+
+    def rendered(
+        self,
+        iteration: int,
+        seconds: Optional[float] = None,
+        bytes_written: Optional[int] = None,
+    ) -> None:
+        """Complete a step, without timings if its frame was dropped."""
+        with self.lock:
+            record = self.pending.pop(iteration, None)
+            if record is None:
+                return
+            record["render_seconds"] = seconds
+            record["bytes_written"] = bytes_written
+        self.write(record)
+
+    def write(self, record: Metrics) -> None:
+        if self.csv:
+            self.csv.writerow(record)
+        elif self.sink:
+            self.sink.write(json.dumps(record) + "\n")
+
+    def overlay(self, iteration: int) -> str:
+        """This step's cells and the mean timings of the recent drawn steps."""
+        with self.lock:
+            records = list(self.records)
+        current = next(
+            (r for r in reversed(records) if r["iteration"] == iteration), None
+        )
+        drawn = [r for r in records if r["render_seconds"] is not None]
+        parts = []
+        if current:
+            births, deaths = current["births"], current["deaths"]
+            parts.append(f"{current['population']} alive +{births} -{deaths}")
+            left, top = current["left"], current["top"]
+            right, bottom = current["right"], current["bottom"]
+            # All None on an empty board
+            if not (left is None or top is None or right is None or bottom is None):
+                parts.append(f"box {right - left + 1}x{bottom - top + 1}")
+        if records:
+            update = sum(r["update_seconds"] for r in records) / len(records)
+            parts.append(f"update {update * 1000:.2f} ms")
+        if drawn:
+            render = sum(r["render_seconds"] or 0 for r in drawn) / len(drawn)
+            written = sum(r["bytes_written"] or 0 for r in drawn) / len(drawn)
+            parts.append(f"render {render * 1000:.2f} ms {written / 1000:.1f} kB")
+        return ", ".join(parts) + "." if parts else ""
+
+    def close(self) -> None:
+        with self.lock:
+            undrawn = sorted(self.pending.items())
+            self.pending.clear()
+        for _, record in undrawn:
+            self.write(record)
+        if self.sink:
+            self.sink.close()
+            self.sink = None
+
+
+class Engine(abc.ABC):
+    """An alternative to update() that may keep its own board representation.
+
+    Engines remember the last board they returned, so feeding their output back in
+    skips the conversion from a Board.
+    """
+
+    def __init__(self, surface: Surface, rule: Rule = CONWAY) -> None:
+        self.surface = surface
+        self.rule = rule
+        self.last_board: Optional[Board] = None
+
+    @abc.abstractmethod
+    def __call__(self, board: Board) -> Board:
+        pass
+
+
+def padded_step(padded, rule: Rule = CONWAY):
+    """Next generation of the inside of a NumPy array padded by one cell on each side.
+
+    The last two axes are rows and columns, any axes before them are a batch of boards.
+    """
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    height = padded.shape[-2] - 2
+    width = padded.shape[-1] - 2
+    cells = padded[..., 1:-1, 1:-1]
+    counts = padded[..., 0:height, 0:width].copy()
+    for dy in range(3):
+        for dx in range(3):
+            if (dy, dx) not in ((0, 0), (1, 1)):
+                counts += padded[..., dy : dy + height, dx : dx + width]
+    counts += 9 * cells
+    return numpy.array(rule, dtype=bool)[counts]
+
+
+class NumpyEngine(Engine):
+    """Count neighbors with eight shifted adds over a uint8 array."""
+
+    def __init__(self, surface: Surface, rule: Rule = CONWAY) -> None:
+        super().__init__(surface, rule)
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        self.np = numpy
+        # numpy is optional, so its arrays aren't typed here
+        self.cells: Any = None
+
+    def to_array(self, board: Board):
+        board = Board.from_rows(board)
+        packed = self.np.frombuffer(board.data, dtype=self.np.uint8)
+        return self.np.unpackbits(
+            packed.reshape(board.height, board.stride),
+            axis=1,
+            count=board.width,
+            bitorder="little",
+        )
+
+    def to_board(self, cells) -> Board:
+        packed = self.np.packbits(cells, axis=1, bitorder="little")
+        return Board(cells.shape[1], cells.shape[0], bytearray(packed.tobytes()))
+
+    def step(self, cells):
+        # "sphere" wraps both axes, every other surface is dead outside the board
+        mode = "wrap" if self.surface == "sphere" else "constant"
+        return padded_step(self.np.pad(cells, 1, mode=mode), self.rule)
+
+    def __call__(self, board: Board) -> Board:
+        if board is not self.last_board or self.cells is None:
+            self.cells = self.to_array(board)
+        self.cells = self.step(self.cells).view(self.np.uint8)
+        self.last_board = self.to_board(self.cells)
+        return self.last_board
+
+
+# Shared memory attached by this worker process, by name
+strip_buffers: dict[str, tuple] = {}
+
+
+def attach_strip_buffer(name: str, shape: tuple[int, int]):
+    import numpy  # pylint: disable=import-outside-toplevel
+    from multiprocessing import shared_memory  # pylint: disable=import-outside-toplevel
+
+    if name not in strip_buffers:
+        memory = shared_memory.SharedMemory(name=name)
+        strip_buffers[name] = (
+            memory,
+            numpy.ndarray(shape, dtype=numpy.uint8, buffer=memory.buf),
+        )
+    return strip_buffers[name][1]
+
+
+def step_strip(
+    source: str,
+    target: str,
+    shape: tuple[int, int],
+    y0: int,
+    y1: int,
+    surface: Surface,
+    rule: Rule,
+) -> None:
+    """Step rows y0 to y1 of the shared board, reading one halo row on each side."""
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    cells = attach_strip_buffer(source, shape)
+    out = attach_strip_buffer(target, shape)
+    height = shape[0]
+    mode: Literal["wrap", "constant"] = "wrap" if surface == "sphere" else "constant"
+    if surface == "sphere":
+        strip = cells[[y % height for y in range(y0 - 1, y1 + 1)]]
+    else:
+        strip = numpy.pad(
+            cells[max(y0 - 1, 0) : min(y1 + 1, height)],
+            ((int(y0 == 0), int(y1 == height)), (0, 0)),
+        )
+    out[y0:y1] = padded_step(numpy.pad(strip, ((0, 0), (1, 1)), mode=mode), rule)
+
+
+class TiledEngine(NumpyEngine):
+    """Step horizontal strips of the board in a pool of worker processes.
+
+    Both generations live in shared memory, so only the strip bounds are sent to the
+    workers.
+    """
+
+    def __init__(self, surface: Surface, workers: int, rule: Rule = CONWAY) -> None:
+        super().__init__(surface, rule)
+        self.workers = workers
+        self.pool: Any = None
+        self.buffers: list = []
+        self.current = 0
+
+    def allocate(self, shape: tuple[int, int]) -> None:
+        import multiprocessing.shared_memory  # pylint: disable=import-outside-toplevel
+
+        self.close()
+        size = max(1, shape[0] * shape[1])
+        self.buffers = [
+            multiprocessing.shared_memory.SharedMemory(create=True, size=size)
+            for _ in range(2)
+        ]
+        self.cells = [
+            self.np.ndarray(shape, dtype=self.np.uint8, buffer=memory.buf)
+            for memory in self.buffers
+        ]
+        self.pool = multiprocessing.Pool(self.workers)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+        self.cells = None
+        for memory in self.buffers:
+            memory.close()
+            memory.unlink()
+        self.buffers = []
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __call__(self, board: Board) -> Board:
+        if board is not self.last_board or self.cells is None:
+            cells = self.to_array(board)
+            if self.cells is None or self.cells[0].shape != cells.shape:
+                self.allocate(cells.shape)
+            self.current = 0
+            self.cells[self.current][:] = cells
+        shape = self.cells[0].shape
+        height = shape[0]
+        strips = min(self.workers, height)
+        bounds = [height * i // strips for i in range(strips + 1)]
+        source = self.buffers[self.current].name
+        target = self.buffers[1 - self.current].name
+        self.pool.starmap(
+            step_strip,
+            [
+                (source, target, shape, y0, y1, self.surface, self.rule)
+                for y0, y1 in zip(bounds, bounds[1:])
+            ],
+        )
+        self.current = 1 - self.current
+        self.last_board = self.to_board(self.cells[self.current])
+        return self.last_board
+
+
+BATCH_HISTORY = 256
+
+
+def random_batch(
+    count: int, height: int, width: int, seed: int = 0, density: float = 1 / 3
+):
+    """A (count, height, width) uint8 array of random boards, like --random-board."""
+    import numpy  # pylint: disable=import-outside-toplevel
 
+    rng = numpy.random.default_rng(seed)
+    return (rng.random((count, height, width)) < density).view(numpy.uint8)
 
-def pick_updater(source: str, surface: Surface) -> Callable[[Board], Board]:
-    def command(board_str: str) -> list[str]:
-        if source.endswith(".py"):
-            return ["python3", source, board_str]
-        if source.endswith(".bin"):
-            return [source, board_str]
-        return ["echo", "Unknown source"]
 
-    def external(board: Board) -> Board:
+def batch_fingerprints(cells):
+    """One 64-bit hash per board, a multiply-add over the bit-packed board."""
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    count = cells.shape[0]
+    packed = numpy.packbits(cells.reshape(count, -1), axis=1)
+    padding = -packed.shape[1] % 8
+    if padding:
+        packed = numpy.pad(packed, ((0, 0), (0, padding)))
+    words = packed.view(numpy.uint64)
+    multipliers = numpy.random.default_rng(0).integers(
+        0, 1 << 63, words.shape[1], dtype=numpy.uint64, endpoint=True
+    )
+    return (words * (multipliers | numpy.uint64(1))).sum(axis=1, dtype=numpy.uint64)
+
+
+def run_batch(
+    cells,
+    surface: Surface = surfaces[0],
+    rule: Rule = CONWAY,
+    max_generations: int = 10000,
+    history: int = BATCH_HISTORY,
+) -> Iterator[dict]:
+    """Step a stack of boards together until each one dies or repeats.
+
+    cells is a (boards, height, width) array. A result is yielded as soon as a
+    board is done, with its index, final population, the generation reached, and
+    the period and start of its cycle. Cycles longer than history are reported as
+    unfinished, with period None, once max_generations is reached.
+    """
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    # "sphere" wraps both axes, every other surface is dead outside the board
+    mode: Literal["wrap", "constant"] = "wrap" if surface == "sphere" else "constant"
+    padding = ((0, 0), (1, 1), (1, 1))
+    cells = numpy.asarray(cells, dtype=numpy.uint8)
+    index = numpy.arange(cells.shape[0])
+    seen = numpy.zeros((cells.shape[0], history), dtype=numpy.uint64)
+    seen_at = numpy.full(history, -1)
+    generation = 0
+
+    while cells.shape[0]:
+        fingerprints = batch_fingerprints(cells)
+        population = cells.sum(axis=(1, 2))
+        matches = (seen == fingerprints[:, None]) & (seen_at >= 0)
+        done = matches.any(axis=1) | (population == 0)
+        if generation == max_generations:
+            done[:] = True
+        for i in numpy.flatnonzero(done):
+            period: Optional[int]
+            start: Optional[int]
+            if population[i] == 0:
+                period, start = 1, generation
+            elif matches[i].any():
+                start = int(seen_at[matches[i]][0])
+                period, start = generation - start, start
+            else:
+                period = start = None
+            yield {
+                "index": int(index[i]),
+                "population": int(population[i]),
+                "generation": generation,
+                "period": period,
+                "start": start,
+            }
+        alive = ~done
+        cells, index, seen = cells[alive], index[alive], seen[alive]
+        seen[:, generation % history] = fingerprints[alive]
+        seen_at[generation % history] = generation
+        cells = padded_step(numpy.pad(cells, padding, mode=mode), rule).view(
+            numpy.uint8
+        )
+        generation += 1
+
+
+def soup_results(
+    seed: int,
+    count: int,
+    height: int,
+    width: int,
+    density: float,
+    surface: Surface,
+    rule: str,
+    max_generations: int,
+) -> list[dict]:
+    """Results for one batch of random boards, run in a worker process by soup.py."""
+    cells = random_batch(count, height, width, seed, density)
+    results = list(run_batch(cells, surface, parse_rule(rule), max_generations))
+    for result in results:
+        result["seed"] = seed
+    return results
+
+
+HASHLIFE_MAX_NODES = 1 << 20
+
+
+class HashLifeNode:
+    """A canonical quadtree node. Level 0 nodes are single cells."""
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level: int, nw, ne, sw, se, population: int) -> None:
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLifeEngine(Engine):
+    """Memoized quadtree stepping, 2**step_exponent generations per call.
+
+    The universe is unbounded whatever the surface; only the window of the board
+    that was loaded is rendered back.
+    """
+
+    on = HashLifeNode(0, None, None, None, None, 1)
+    off = HashLifeNode(0, None, None, None, None, 0)
+
+    def __init__(
+        self,
+        surface: Surface,
+        rule: Rule = CONWAY,
+        step_exponent: int = 0,
+        max_nodes: int = HASHLIFE_MAX_NODES,
+    ) -> None:
+        super().__init__(surface, rule)
+        if rule[0]:
+            raise ValueError(
+                "HashLife can't run B0 rules, empty space would come alive"
+            )
+        if step_exponent < 0:
+            raise ValueError(f"step exponent should be at least 0: {step_exponent}")
+        self.step_exponent = step_exponent
+        self.max_nodes = max_nodes
+        self.nodes: dict[tuple, HashLifeNode] = {}
+        self.results: dict[tuple[HashLifeNode, int], HashLifeNode] = {}
+        self.empties: list[HashLifeNode] = [HashLifeEngine.off]
+        self.root = HashLifeEngine.off
+        # Board coordinates of the top left corner of the root
+        self.origin = (0, 0)
+        self.window = (0, 0)
+
+    def join(self, nw, ne, sw, se) -> HashLifeNode:
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = HashLifeNode(nw.level + 1, nw, ne, sw, se, population)
+            self.nodes[key] = node
+        return node
+
+    def empty_node(self, level: int) -> HashLifeNode:
+        while len(self.empties) <= level:
+            e = self.empties[-1]
+            self.empties.append(self.join(e, e, e, e))
+        return self.empties[level]
+
+    def expand(self, node: HashLifeNode) -> HashLifeNode:
+        e = self.empty_node(node.level - 1)
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e),
+        )
+
+    def center(self, node: HashLifeNode) -> HashLifeNode:
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    @staticmethod
+    def is_centered(node: HashLifeNode) -> bool:
+        """All live cells are in the middle quarter of the node."""
+        return (
+            node.nw.population == node.nw.se.se.population
+            and node.ne.population == node.ne.sw.sw.population
+            and node.sw.population == node.sw.ne.ne.population
+            and node.se.population == node.se.nw.nw.population
+        )
+
+    def base(self, node: HashLifeNode) -> HashLifeNode:
+        """Advance the middle 2x2 of a 4x4 node by one generation."""
+        cells = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        out = []
+        for y in (1, 2):
+            for x in (1, 2):
+                count = sum(
+                    cells[y + dy][x + dx].population
+                    for dy in (-1, 0, 1)
+                    for dx in (-1, 0, 1)
+                    if dy or dx
+                )
+                alive = self.rule[count + 9 * cells[y][x].population]
+                out.append(HashLifeEngine.on if alive else HashLifeEngine.off)
+        return self.join(*out)
+
+    def successor(self, node: HashLifeNode, j: int) -> HashLifeNode:
+        """The center of the node, 2**j generations later. Requires j <= level - 2."""
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+        if node.population == 0:
+            result = self.empty_node(node.level - 1)
+        elif node.level == 2:
+            result = self.base(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            nine = [
+                nw,
+                self.join(nw.ne, ne.nw, nw.se, ne.sw),
+                ne,
+                self.join(nw.sw, nw.se, sw.nw, sw.ne),
+                self.join(nw.se, ne.sw, sw.ne, se.nw),
+                self.join(ne.sw, ne.se, se.nw, se.ne),
+                sw,
+                self.join(sw.ne, se.nw, sw.se, se.sw),
+                se,
+            ]
+            if j == node.level - 2:
+                # Full speed: two half steps
+                j -= 1
+                nine = [self.successor(n, j) for n in nine]
+            else:
+                nine = [self.center(n) for n in nine]
+            result = self.join(
+                *(
+                    self.successor(
+                        self.join(nine[i], nine[i + 1], nine[i + 3], nine[i + 4]), j
+                    )
+                    for i in (0, 1, 3, 4)
+                )
+            )
+        self.results[key] = result
+        return result
+
+    def build(self, rows: list[int], x: int, y: int, level: int) -> HashLifeNode:
+        size = 1 << level
+        mask = (1 << size) - 1
+        if not any(row >> x & mask for row in rows[y : y + size]):
+            return self.empty_node(level)
+        if level == 0:
+            return HashLifeEngine.on
+        half = size >> 1
+        return self.join(
+            self.build(rows, x, y, level - 1),
+            self.build(rows, x + half, y, level - 1),
+            self.build(rows, x, y + half, level - 1),
+            self.build(rows, x + half, y + half, level - 1),
+        )
+
+    def load(self, board: Board) -> None:
+        board = Board.from_rows(board)
+        self.window = (board.width, board.height)
+        level = max(3, max(self.window).bit_length())
+        self.root = self.build(
+            [board.row_bits(y) for y in range(board.height)], 0, 0, level
+        )
+        self.origin = (0, 0)
+
+    def render(self) -> Board:
+        width, height = self.window
+        rows = [0] * height
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            node, x, y = stack.pop()
+            size = 1 << node.level
+            if (
+                node.population == 0
+                or x >= width
+                or y >= height
+                or x + size <= 0
+                or y + size <= 0
+            ):
+                continue
+            if node.level == 0:
+                rows[y] |= 1 << x
+                continue
+            half = size >> 1
+            stack.append((node.nw, x, y))
+            stack.append((node.ne, x + half, y))
+            stack.append((node.sw, x, y + half))
+            stack.append((node.se, x + half, y + half))
+        out = Board(width, height)
+        for y, bits in enumerate(rows):
+            out.set_row_bits(y, bits)
+        return out
+
+    def step(self) -> None:
+        j = self.step_exponent
+        root = self.root
+        x, y = self.origin
+        while root.level < j + 3 or not self.is_centered(root):
+            x -= 1 << (root.level - 1)
+            y -= 1 << (root.level - 1)
+            root = self.expand(root)
+        x += 1 << (root.level - 2)
+        y += 1 << (root.level - 2)
+        self.root = self.successor(root, j)
+        self.origin = (x, y)
+        if len(self.nodes) > self.max_nodes:
+            self.collect()
+
+    def collect(self) -> None:
+        """Forget memoized results and every node not reachable from the root."""
+        self.results.clear()
+        kept: dict[tuple, HashLifeNode] = {}
+        stack = [self.root, *self.empties]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in kept:
+                continue
+            kept[key] = node
+            stack.extend(key)
+        self.nodes = kept
+
+    def __call__(self, board: Board) -> Board:
+        if board is not self.last_board:
+            self.load(board)
+        self.step()
+        self.last_board = self.render()
+        return self.last_board
+
+
+class SparseEngine(Engine):
+    """Keep only the live cells, only revisit cells next to the last changes.
+
+    On the "infinite" surface cells may leave the loaded board and come back later.
+    """
+
+    offsets = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+
+    def __init__(self, surface: Surface, rule: Rule = CONWAY) -> None:
+        super().__init__(surface, rule)
+        if rule[0]:
+            raise ValueError(
+                "The sparse engine can't run B0 rules, every dead cell is active"
+            )
+        self.live: set[tuple[int, int]] = set()
+        self.changed: set[tuple[int, int]] = set()
+        self.window = (0, 0)
+
+    def load(self, board: Board) -> None:
+        self.window = (board.width, board.height)
+        self.live = set()
+        for y in range(board.height):
+            bits = board.row_bits(y)
+            while bits:
+                x = (bits & -bits).bit_length() - 1
+                self.live.add((x, y))
+                bits &= bits - 1
+        self.changed = set(self.live)
+
+    def neighborhood(self, x: int, y: int) -> list[tuple[int, int]]:
+        width, height = self.window
+        if self.surface == "sphere":
+            return [((x + dx) % width, (y + dy) % height) for dx, dy in self.offsets]
+        if self.surface == "infinite":
+            return [(x + dx, y + dy) for dx, dy in self.offsets]
+        return [
+            (x + dx, y + dy)
+            for dx, dy in self.offsets
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        ]
+
+    def step(self) -> None:
+        live = self.live
+        candidates = set(self.changed)
+        for x, y in self.changed:
+            candidates.update(self.neighborhood(x, y))
+        born: list[tuple[int, int]] = []
+        died: list[tuple[int, int]] = []
+        for x, y in candidates:
+            count = sum(1 for cell in self.neighborhood(x, y) if cell in live)
+            alive = (x, y) in live
+            if alive != self.rule[count + 9 * alive]:
+                (died if alive else born).append((x, y))
+        live.difference_update(died)
+        live.update(born)
+        self.changed = set(born)
+        self.changed.update(died)
+
+    def render(self, board: Board) -> Board:
+        """Copy the previous board and only rewrite the cells that changed."""
+        width, height = self.window
+        out = board.copy()
+        for x, y in self.changed:
+            if 0 <= x < width and 0 <= y < height:
+                out[y][x] = (x, y) in self.live
+        return out
+
+    def __call__(self, board: Board) -> Board:
+        if board is not self.last_board:
+            board = Board.from_rows(board)
+            self.load(board)
+        self.step()
+        self.last_board = self.render(board)
+        return self.last_board
+
+
+class LutEngine(Engine):
+    """Look up the next state of each 2x2 block from its 4x4 neighborhood.
+
+    Row r of the neighborhood is bits 4r to 4r + 3 of a 16-bit index, the tables
+    give the block's top and bottom row as 2 bits each. Only the standard library
+    is needed.
+    """
+
+    # Top and bottom rows of the block for every neighborhood, per rule
+    tables: dict[Rule, tuple[bytes, bytes]] = {}
+
+    @classmethod
+    def table(cls, rule: Rule) -> tuple[bytes, bytes]:
+        if rule not in cls.tables:
+            # Next state of the center of a 3x3 neighborhood, row r is bits 3r to 3r + 2
+            center = [
+                rule[(n & 0b111101111).bit_count() + 9 * (n >> 4 & 1)]
+                for n in range(1 << 9)
+            ]
+
+            def cell(n: int, y: int, x: int) -> int:
+                # The 3x3 neighborhood around row y and column x of the 4x4 one
+                shift = 4 * (y - 1) + x - 1
+                return center[
+                    (n >> shift & 7)
+                    | (n >> shift + 4 & 7) << 3
+                    | (n >> shift + 8 & 7) << 6
+                ]
+
+            cls.tables[rule] = (
+                bytes(cell(n, 1, 1) | cell(n, 1, 2) << 1 for n in range(1 << 16)),
+                bytes(cell(n, 2, 1) | cell(n, 2, 2) << 1 for n in range(1 << 16)),
+            )
+        return cls.tables[rule]
+
+    def __call__(self, board: Board) -> Board:
+        board = Board.from_rows(board)
+        width, height = board.width, board.height
+        if not width or not height:
+            return board.copy()
+        top, bottom = self.table(self.rule)
+        rows = [board.row_bits(y) for y in range(height)]
+        # Cell x is bit x + 1, with the neighboring cells at bits 0 and width + 1
+        if self.surface == "sphere":
+            padded = [
+                row << 1 | row >> width - 1 | (row & 1) << width + 1 for row in rows
+            ]
+            padded = [padded[-1], *padded, padded[0]]
+        else:
+            padded = [0, *(row << 1 for row in rows), 0]
+        if height % 2:
+            padded.append(0)
+        # Neighborhood rows for each block, blocks padded to a whole byte per row
+        blocks = range(0, width + -width % 8, 2)
+        nibbles = [[row >> x & 15 for x in blocks] for row in padded]
+
+        data = bytearray()
+        for y in range(0, height, 2):
+            first, second, third, fourth = nibbles[y : y + 4]
+            neighborhoods = [
+                a | b << 4 | c << 8 | d << 12
+                for a, b, c, d in zip(first, second, third, fourth)
+            ]
+            for half in (top, bottom)[: min(2, height - y)]:
+                states = iter([half[n] for n in neighborhoods])
+                data += bytes(
+                    a | b << 2 | c << 4 | d << 6 for a, b, c, d in zip(*[states] * 4)
+                )
+        result = Board(width, height, data)
+        if width % 8:
+            # Clear the cells past the right edge
+            mask = (1 << width % 8) - 1
+            for end in range(result.stride - 1, len(data), result.stride):
+                data[end] &= mask
+        self.last_board = result
+        return result
+
+
+def pack(board: BoardLike, width: int) -> bytes:
+    """Rows of ceil(width / 8) bytes, cell x is bit x of the little-endian row."""
+    if isinstance(board, Board) and board.width == width:
+        return bytes(board.data)
+    stride = (width + 7) // 8
+    return b"".join(
+        int("".join("1" if cell else "0" for cell in reversed(row)) or "0", 2).to_bytes(
+            stride, "little"
+        )
+        for row in board
+    )
+
+
+def unpack(width: int, height: int, data: bytes | bytearray) -> Board:
+    return Board(width, height, bytearray(data))
+
+
+class ExternalEngine(Engine):
+    """Talk to a variant script through a persistent variants/worker.py process.
+
+    Boards are sent bit-packed as frames, see variants/worker.py for the protocol.
+    When the last board returned is passed back in, only a request for the next
+    generation is sent.
+    """
+
+    frame = struct.Struct("<iII")
+
+    def __init__(self, surface: Surface, source: str) -> None:
         # ignore surface
-        encoded_board = show(board, alphabet=("#", "."))
-        output = subprocess.check_output(command(encoded_board)).decode("utf-8")
-        return parse(output.split("\n"))
+        super().__init__(surface)
+        worker = os.path.join(os.path.dirname(source), "worker.py")
+        self.process = subprocess.Popen(
+            ["python3", worker, source], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+
+    def read(self) -> Board:
+        assert self.process.stdout is not None
+        header = self.process.stdout.read(self.frame.size)
+        if len(header) < self.frame.size:
+            raise EOFError(f"external variant exited with {self.process.wait()}")
+        width, height, _ = self.frame.unpack(header)
+        data = self.process.stdout.read(height * ((width + 7) // 8))
+        return unpack(width, height, data)
+
+    def __call__(self, board: Board) -> Board:
+        assert self.process.stdin is not None
+        if board is self.last_board:
+            self.process.stdin.write(self.frame.pack(-1, 0, 1))
+        else:
+            board = Board.from_rows(board)
+            self.process.stdin.write(self.frame.pack(board.width, board.height, 1))
+            self.process.stdin.write(board.data)
+        self.process.stdin.flush()
+        self.last_board = self.read()
+        return self.last_board
+
+    def close(self) -> None:
+        if self.process.stdin is not None and not self.process.stdin.closed:
+            self.process.stdin.close()
+        self.process.wait()
 
+    def __del__(self) -> None:
+        self.close()
+
+
+def pick_updater(
+    source: str,
+    surface: Surface,
+    step_exponent: int = 0,
+    workers: int = 1,
+    rule: Rule = CONWAY,
+) -> Callable[[Board], Board]:
     def default(board: Board) -> Board:
-        return update(board, surface=surface)
+        return update(board, surface=surface, rule=rule)
 
     if source.startswith("./variants"):
         print("Using external script", source)
-        return external
+        if rule != CONWAY:
+            print("External scripts ignore the rule and use B3/S23")
+        return ExternalEngine(surface, source)
+    if workers > 1:
+        if source in ("python", "numpy"):
+            return TiledEngine(surface, workers, rule)
+        print("Ignoring --workers for source", source)
+    if source == "numpy":
+        return NumpyEngine(surface, rule)
+    if source == "hashlife":
+        if surface != "infinite":
+            raise ValueError(
+                f"hashlife only simulates an infinite surface, not {surface}"
+            )
+        return HashLifeEngine(surface, rule, step_exponent=step_exponent)
+    if source == "sparse":
+        return SparseEngine(surface, rule)
+    if source == "lut":
+        return LutEngine(surface, rule)
     return default
 
 
 class Display(abc.ABC):
+    # Whether frames are paced in real time with --delay and --start-delay
+    realtime = True
+    # Sent to the device by the last display() call
+    bytes_written = 0
+
     @abc.abstractmethod
     def display(self, board: Board, iteration: int, args: OutputArgs) -> None:
         pass
 
+    def wait(self, iteration: int, args: OutputArgs) -> None:
+        """Pause before displaying a step, unless the loop paces the frames itself."""
 
-class NeoPixel(Display):
-    width = 16
-    height = 16
-    color = (255, 0, 0)
+    def close(self) -> None:
+        pass
 
-    def __init__(self) -> None:
+
+class NeoPixelStrip:
+    """NeoPixels on the Raspberry Pi, written a whole GRB frame at a time."""
+
+    def __init__(self, n: int) -> None:
         # This 'board' refers to the circuitboard
         import board
-        import neopixel
+        import digitalio
+        from neopixel_write import neopixel_write
 
         # Raspberry Pi
         # Choose an open pin connected to the Data In of the NeoPixel strip, i.e. board.D18
@@ -210,39 +1736,265 @@ class NeoPixel(Display):
         # D12 = GPIO18
         # D19 - GPIO10, MOSI, part of userspace SPI driver
         assert board.D10 == board.MOSI
-        pin = board.D10
-        # pixel order?
-        self.pixels = neopixel.NeoPixel(pin, self.width * self.height, auto_write=False)
-        self.pixels.brightness = 0.5
-        print(f"Initialized {self.pixels.n} pixels, {self.width}x{self.height}")
+        self.pin = digitalio.DigitalInOut(board.D10)
+        self.pin.direction = digitalio.Direction.OUTPUT
+        self.neopixel_write = neopixel_write
+        self.n = n
+
+    def write(self, buffer: bytearray) -> None:
+        self.neopixel_write(self.pin, buffer)
+
+    def deinit(self) -> None:
+        self.write(bytearray(3 * self.n))
+        self.pin.deinit()
+
+
+class MemoryPixels:
+    """Stands in for NeoPixelStrip, to measure frame throughput without the hardware."""
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.buffer = bytearray(3 * n)
+        self.writes = 0
+
+    def write(self, buffer: bytearray) -> None:
+        self.buffer[:] = buffer
+        self.writes += 1
+
+    def deinit(self) -> None:
+        self.buffer = bytearray(3 * self.n)
+
+
+def byte_pixels(on: bytes, off: bytes, reverse: bool = False) -> list[bytes]:
+    """The pixels for the 8 cells packed in each possible byte, see pack()."""
+    order = range(7, -1, -1) if reverse else range(8)
+    return [
+        b"".join(on if byte >> i & 1 else off for i in order) for byte in range(256)
+    ]
+
+
+class NeoPixel(Display):
+    width = 16
+    height = 16
+    color = (255, 0, 0)
+    brightness = 0.5
+
+    def __init__(self, pixels=None, serpentine: bool = False) -> None:
+        n = self.width * self.height
+        self.pixels = pixels if pixels is not None else NeoPixelStrip(n)
+        self.serpentine = serpentine
+        # Index on the strip of each cell, row by row
+        self.pixel_map = [
+            self.strip_index(x, y)
+            for y in range(self.height)
+            for x in range(self.width)
+        ]
+        red, green, blue = (int(c * self.brightness) for c in self.color)
+        self.on = bytes((green, red, blue))
+        self.off = bytes(3)
+        self.byte_pixels = byte_pixels(self.on, self.off)
+        self.byte_pixels_reversed = byte_pixels(self.on, self.off, reverse=True)
+        self.buffer = bytearray(3 * n)
+        self.last: Optional[Board] = None
+        print(f"Initialized {n} pixels, {self.width}x{self.height}")
 
     def __del__(self) -> None:
         self.pixels.deinit()
         print("Turned off neopixel display")
 
-    def display(self, game_board: Board, iteration: int, args: OutputArgs) -> None:
-        delay = args.get("delay")
+    def strip_index(self, x: int, y: int) -> int:
+        """Serpentine strips run right to left on odd rows."""
+        if self.serpentine and y % 2:
+            x = self.width - 1 - x
+        return y * self.width + x
+
+    def frame(self, board: Board) -> bytearray:
+        """Every pixel of the strip, built a row of bytes at a time."""
+        padding = 3 * (8 * board.stride - self.width)
+        rows = []
+        for y in range(self.height):
+            row = board.data[y * board.stride : (y + 1) * board.stride]
+            if self.serpentine and y % 2:
+                rows.append(
+                    b"".join(self.byte_pixels_reversed[byte] for byte in reversed(row))[
+                        padding:
+                    ]
+                )
+            else:
+                rows.append(
+                    b"".join(self.byte_pixels[byte] for byte in row)[: 3 * self.width]
+                )
+        return bytearray(b"".join(rows))
 
+    def display(self, game_board: Board, iteration: int, args: OutputArgs) -> None:
         # Resize to fit the display
-        reduced_board = add(empty(self.width, self.height), game_board)
-        assert len(reduced_board) == self.height
-        assert len(reduced_board[0]) == self.width
-
-        i = 0
-        for row in reduced_board:
-            for cell in row:
-                if cell:
-                    self.pixels[i] = self.color
-                else:
-                    self.pixels[i] = (0, 0, 0)
-                i += 1
+        board = add(empty(self.width, self.height), game_board)
+
+        if self.last is None:
+            self.buffer = self.frame(board)
+        else:
+            changed = False
+            for y in range(self.height):
+                bits = board.row_bits(y)
+                diff = bits ^ self.last.row_bits(y)
+                changed = changed or diff != 0
+                while diff:
+                    x = (diff & -diff).bit_length() - 1
+                    i = 3 * self.pixel_map[y * self.width + x]
+                    self.buffer[i : i + 3] = self.on if bits >> x & 1 else self.off
+                    diff &= diff - 1
+            if not changed:
+                self.bytes_written = 0
+                return
+        self.last = board
+
         start_time = time.time()
-        self.pixels.show()
+        self.pixels.write(self.buffer)
+        self.bytes_written = len(self.buffer)
         elapsed = time.time() - start_time
         if iteration % 10 == 1:
             print(f"Drew to screen in {elapsed} seconds")
 
 
+class APNGWriter:
+    """Write RGB frames to an animated PNG as they arrive."""
+
+    signature = b"\x89PNG\r\n\x1a\n"
+
+    def __init__(self, path: str, width: int, height: int, delay: float) -> None:
+        self.file = open(path, "wb")  # pylint: disable=consider-using-with
+        self.width = width
+        self.height = height
+        self.delay = (max(1, round(delay * 1000)), 1000)
+        self.frames = 0
+        self.sequence = 0
+        self.file.write(self.signature)
+        self.chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        # The frame count is filled in by close()
+        self.actl_offset = self.file.tell()
+        self.chunk(b"acTL", struct.pack(">II", 0, 0))
+
+    def chunk(self, kind: bytes, data: bytes) -> None:
+        self.file.write(struct.pack(">I", len(data)) + kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write(self, frame: bytes) -> None:
+        stride = 3 * self.width
+        # Filter type 0 before every scanline
+        scanlines = b"".join(
+            b"\x00" + frame[y * stride : (y + 1) * stride] for y in range(self.height)
+        )
+        self.chunk(
+            b"fcTL",
+            struct.pack(
+                ">IIIIIHHBB",
+                self.sequence,
+                self.width,
+                self.height,
+                0,
+                0,
+                *self.delay,
+                0,
+                0,
+            ),
+        )
+        self.sequence += 1
+        data = zlib.compress(scanlines, 1)
+        if self.frames == 0:
+            self.chunk(b"IDAT", data)
+        else:
+            self.chunk(b"fdAT", struct.pack(">I", self.sequence) + data)
+            self.sequence += 1
+        self.frames += 1
+
+    def close(self) -> None:
+        self.chunk(b"IEND", b"")
+        self.file.seek(self.actl_offset)
+        self.chunk(b"acTL", struct.pack(">II", self.frames, 0))
+        self.file.close()
+
+
+class EncoderPipe:
+    """Pipe raw RGB frames into ffmpeg, which picks the format from the file name."""
+
+    def __init__(self, path: str, width: int, height: int, delay: float) -> None:
+        fps = 1 / delay if delay > 0 else 30
+        self.process = subprocess.Popen(
+            # fmt: off
+            [
+                "ffmpeg", "-loglevel", "error", "-y",
+                "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", f"{width}x{height}", "-r", str(fps),
+                "-i", "-",
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+                path,
+            ],
+            # fmt: on
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, frame: bytes) -> None:
+        assert self.process.stdin is not None
+        self.process.stdin.write(frame)
+
+    def close(self) -> None:
+        assert self.process.stdin is not None
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class Recorder(Display):
+    """Render every generation to a video file as fast as possible.
+
+    Files ending in .png are written as animated PNGs, anything else is encoded by
+    ffmpeg. Each cell is scale x scale pixels.
+    """
+
+    realtime = False
+    live_color = (255, 255, 255)
+    dead_color = (0, 0, 0)
+
+    def __init__(self, path: str, scale: int = 4) -> None:
+        self.path = path
+        self.scale = scale
+        self.encoder: Optional[APNGWriter | EncoderPipe] = None
+        self.size = (0, 0)
+        self.byte_pixels = byte_pixels(
+            bytes(self.live_color) * scale, bytes(self.dead_color) * scale
+        )
+
+    def frame(self, board: Board) -> bytes:
+        row_size = 3 * self.scale * board.width
+        rows = []
+        for y in range(board.height):
+            row = board.data[y * board.stride : (y + 1) * board.stride]
+            rows.append(
+                b"".join([self.byte_pixels[byte] for byte in row])[:row_size]
+                * self.scale
+            )
+        return b"".join(rows)
+
+    def display(self, board: Board, iteration: int, args: OutputArgs) -> None:
+        board = Board.from_rows(board)
+        if self.encoder is None:
+            self.size = (board.width, board.height)
+            width, height = board.width * self.scale, board.height * self.scale
+            writer = APNGWriter if self.path.endswith(".png") else EncoderPipe
+            self.encoder = writer(self.path, width, height, args.get("delay", 0.03))
+        if (board.width, board.height) != self.size:
+            board = add(empty(*self.size), board)
+        frame = self.frame(board)
+        self.encoder.write(frame)
+        self.bytes_written = len(frame)
+        if iteration and iteration % 1000 == 0:
+            print(f"Recorded {iteration} steps to {self.path}")
+
+    def close(self) -> None:
+        if self.encoder is not None:
+            self.encoder.close()
+            self.encoder = None
+
+
 class CLI(Display):
     current_color = 0
     clear = "\033[2J"
@@ -260,19 +2012,178 @@ class CLI(Display):
     ]
     colors_dict = dict(colors)
 
+    def __init__(self) -> None:
+        # What is on the terminal, for --redraw diff
+        self.last_board: Optional[Board] = None
+        self.last_alphabet: tuple[str, str] = ("", "")
+        self.last_phase = 0
+        self.last_lines: list[str] = []
+        self.bytes_written = 0
+        # Top left of the part of the board on screen, with --follow
+        self.window: Optional[tuple[int, int]] = None
+
+    def status(self, iteration: int, args: OutputArgs) -> str:
+        generations = ""
+        if args.get("step_exponent"):
+            generations = f"{iteration << args['step_exponent']} generations."
+        return " ".join(
+            str(part)
+            for part in (
+                f"The Game of Life. {iteration} steps.",
+                generations,
+                args.get("name", ""),
+                args.get("source", ""),
+                args["rule"] if args.get("rule", "B3/S23") != "B3/S23" else "",
+                "Period {} since step {}.".format(*args["cycle"])
+                if "cycle" in args
+                else "",
+                args["telemetry"].overlay(iteration) if "telemetry" in args else "",
+                "Showing from {},{}.".format(*self.window) if self.window else "",
+            )
+        )
+
+    def viewport(self, board: Board, args: OutputArgs) -> Board:
+        """The part of the board that fits on screen, moved to keep live cells in view.
+
+        The window only moves when live cells leave it, then it's centered on them.
+        """
+        if not args.get("follow") or "screen" not in args:
+            return board
+        board = Board.from_rows(board)
+        width = min(args["screen"][0], board.width)
+        height = min(args["screen"][1], board.height)
+        if (width, height) == (board.width, board.height):
+            self.window = None
+            return board
+        # Keep characters made of several cells lined up with the board
+        align_x, align_y = (
+            (2, GLYPHS[args["glyphs"]][0]) if args.get("glyphs") in GLYPHS else (1, 1)
+        )
+        x, y = self.window or ((board.width - width) // 2, (board.height - height) // 2)
+        box = bounding_box(board)
+        if box:
+            left, top, right, bottom = box
+            if left < x or right >= x + width:
+                x = (left + right + 1) // 2 - width // 2
+            if top < y or bottom >= y + height:
+                y = (top + bottom + 1) // 2 - height // 2
+        x = max(0, min(x, board.width - width)) // align_x * align_x
+        y = max(0, min(y, board.height - height)) // align_y * align_y
+        self.window = (x, y)
+        return crop(board, x, y, width, height)
+
+    def _finish_frame(
+        self, out: list[str], board: Board, iteration: int, args: OutputArgs, lines: int
+    ) -> None:
+        """Add the status below the board's lines to out and write it all at once."""
+        out.append(f"\033[{lines + 1};1H" + CLI.reset_color)
+        if is_empty(board):
+            out.append("empty board\033[K\n")
+        if args.get("color"):
+            out.append(CLI.black_on_white)
+        out.append(self.status(iteration, args) + "\033[K" + CLI.reset_color + "\033[J")
+
+        frame = "".join(out)
+        sys.stdout.write(frame)
+        sys.stdout.flush()
+        self.bytes_written = len(frame.encode("utf-8"))
+
+    def display_glyphs(self, board: Board, iteration: int, args: OutputArgs) -> None:
+        """Draw 2x2 or 2x4 cells per character, rewriting only lines that changed."""
+        lines = show_glyphs(board, args["glyphs"])
+        setcolor = args.get("color")
+        dynamic = setcolor == "dynamic"
+        phase = self.current_color // 5 if dynamic else 0
+        full = args.get("redraw") == "full" or len(lines) != len(self.last_lines)
+        out = []
+        if full:
+            out.append(CLI.reset_color + CLI.clear)
+        if setcolor in CLI.colors_dict:
+            out.append(CLI.colors_dict[setcolor])
+        for y, line in enumerate(lines):
+            if not full and phase == self.last_phase and line == self.last_lines[y]:
+                continue
+            out.append(f"\033[{y + 1};1H")
+            if dynamic:
+                out.append(CLI.colors[(phase + y // 6) % len(CLI.colors)][1])
+            out.append(line)
+
+        self._finish_frame(out, board, iteration, args, len(lines))
+        self.last_lines = lines
+        self.last_phase = phase
+
+    def display_diff(
+        self, board: Board, iteration: int, args: OutputArgs, alphabet: tuple[str, str]
+    ) -> None:
+        """Only write the cells that changed since the last frame, in one write."""
+        live, dead = alphabet
+        setcolor = args.get("color")
+        dynamic = setcolor == "dynamic"
+        phase = self.current_color // 5 if dynamic else 0
+        last = self.last_board
+        out = []
+        if last is None or len(last) != len(board) or alphabet != self.last_alphabet:
+            last = None
+            out.append(CLI.reset_color + CLI.clear)
+        # Dynamic colors shift every 5 frames, repaint every live cell then
+        recolor = phase != self.last_phase
+        if setcolor in CLI.colors_dict:
+            out.append(CLI.colors_dict[setcolor])
+        color = ""
+        for y, row in enumerate(board):
+            prev = last[y] if last is not None else None
+            if prev is not None and len(prev) != len(row):
+                prev = None
+            if prev is row or (not recolor and prev == row):
+                continue
+            cursor = -1
+            for x, cell in enumerate(row):
+                if prev is not None and prev[x] == cell and not (recolor and cell):
+                    continue
+                if x != cursor:
+                    out.append(f"\033[{y + 1};{x * len(live) + 1}H")
+                if cell and dynamic:
+                    cell_color = CLI.colors[
+                        (phase + x // 3 + y // 6) % len(CLI.colors)
+                    ][1]
+                    if cell_color != color:
+                        out.append(cell_color)
+                        color = cell_color
+                out.append(live if cell else dead)
+                cursor = x + 1
+
+        self._finish_frame(out, board, iteration, args, len(board))
+        self.last_board = board
+        self.last_alphabet = alphabet
+        self.last_phase = phase
+
+    def wait(self, iteration: int, args: OutputArgs) -> None:
+        if iteration > 1:
+            time.sleep(args.get("delay", 1.0))
+
     def display(self, board: Board, iteration: int, args: OutputArgs) -> None:
+        board = self.viewport(board, args)
+        if args.get("glyphs") in GLYPHS:
+            self.display_glyphs(board, iteration, args)
+            self.current_color += 1
+            return
+
         alphabet = (LIVE_STR, DEAD_STR)
         if args.get("pretty"):
             alphabet = (LIVE_STR_PRETTY, DEAD_STR_PRETTY)
         if args.get("narrow"):
             alphabet = (alphabet[0][0], alphabet[1][0])
-        
+
         setcolor = args.get("color")
+        full = args.get("redraw") == "full"
 
-        if iteration > 1:
-            if setcolor:
-                print(CLI.reset_color, CLI.clear, end=CLI.to_top)
-            time.sleep(args.get("delay", 1.0))
+        if iteration > 1 and setcolor and full:
+            print(CLI.reset_color, CLI.clear, end=CLI.to_top)
+
+        if not full:
+            self.display_diff(board, iteration, args, alphabet)
+            self.current_color += 1
+            return
 
         # Display
         if setcolor and setcolor in CLI.colors_dict:
@@ -291,17 +2202,19 @@ class CLI(Display):
                 )
                 for y, row in enumerate(board)
             )
-            print(out)
         else:
-            print(show(board, alphabet))
-        if all(not cell for row in board for cell in row):
+            out = show(board, alphabet)
+        print(out)
+        if is_empty(board):
             print("empty board")
 
         self.current_color += 1
-        
+
         if setcolor:
             print(CLI.reset_color + CLI.black_on_white, end="")
-        print(f"The Game of Life. {iteration} steps.", args.get("name", ""), args.get("source", ""))
+        status = self.status(iteration, args)
+        print(status)
+        self.bytes_written = len(out.encode("utf-8")) + len(status.encode("utf-8")) + 2
 
 
 def loop(
@@ -309,55 +2222,263 @@ def loop(
     max_iterations: float = float("inf"),
     surface: Surface = surfaces[0],
     args: Optional[OutputArgs] = None,
+    resume: Optional[Snapshot] = None,
 ) -> None:
     if not args:
         args = {}
 
+    screen: Display
     if args.get("output") == "neopixel":
-        display = NeoPixel().display
+        screen = NeoPixel(serpentine=args.get("serpentine", False))
+    elif args.get("output") == "neopixel-memory":
+        n = NeoPixel.width * NeoPixel.height
+        screen = NeoPixel(MemoryPixels(n), args.get("serpentine", False))
+    elif args.get("output") == "video":
+        screen = Recorder(args.get("record", "gameoflife.png"), args.get("scale", 4))
     else:
-        display = CLI().display
+        screen = CLI()
+    try:
+        run(screen, board, max_iterations, surface, args, resume)
+    finally:
+        screen.close()
 
-    iteration = 0
-    if max_iterations == 0 or args.get("start_delay", 0) > 0:
-        display(board, iteration, args)
+
+def run(
+    screen: Display,
+    board: Board,
+    max_iterations: float,
+    surface: Surface,
+    args: OutputArgs,
+    resume: Optional[Snapshot] = None,
+) -> None:
+    display = screen.display
+    start = resume["generation"] if resume else 0
+    if not screen.realtime:
+        display(board, start, args)
+    elif max_iterations <= start or args.get("start_delay", 0) > 0:
+        display(board, start, args)
         time.sleep(args.get("start_delay", 0))
 
-    update_function = pick_updater(args.get("source", "unknown"), surface)
+    frames = generations(board, max_iterations, surface, args, resume)
+    if screen.realtime and args.get("frame_queue", 0) > 0:
+        paced(screen, frames, args)
+        return
+    try:
+        for iteration, board, cycle in frames:
+            if cycle:
+                args["cycle"] = cycle
+            screen.wait(iteration, args)
+            draw(screen, board, iteration, args)
+    finally:
+        frames.close()
+
+
+def draw(screen: Display, board: Board, iteration: int, args: OutputArgs) -> None:
+    started = time.perf_counter()
+    screen.display(board, iteration, args)
+    if "telemetry" in args:
+        args["telemetry"].rendered(
+            iteration, time.perf_counter() - started, screen.bytes_written
+        )
 
-    while iteration < max_iterations:
-        # Update
-        board = update_function(board)
 
-        iteration += 1
-        display(board, iteration, args)
+Frame = tuple[int, Board, Optional[tuple[int, int]]]
 
 
-def make_init_board(args) -> Board:
+def generations(
+    board: Board,
+    max_iterations: float,
+    surface: Surface,
+    args: OutputArgs,
+    resume: Optional[Snapshot] = None,
+) -> Generator[Frame, None, None]:
+    """Each step, its board and the cycle detected so far.
+
+    With args["checkpoint"], a snapshot is saved every checkpoint_interval seconds
+    and when stopped early. It's removed once max_iterations is reached.
+    """
+    update_function = pick_updater(
+        args.get("source", "unknown"),
+        surface,
+        step_exponent=args.get("step_exponent", 0),
+        workers=args.get("workers", 1),
+        rule=parse_rule(args.get("rule", "B3/S23")),
+    )
+
+    stop_after_cycle = args.get("stop_after_cycle")
+    if resume:
+        iteration = resume["generation"]
+        detector = resume["detector"]
+        cycle = resume["cycle"]
+        if cycle and stop_after_cycle is not None:
+            # Found at the step after the cycle started
+            max_iterations = min(max_iterations, sum(cycle) + stop_after_cycle)
+    else:
+        iteration = 0
+        detector = CycleDetector()
+        detector.check(board, iteration)
+        cycle = None
+
+    telemetry = args.get("telemetry")
+    if telemetry:
+        telemetry.previous = board
+    checkpoint = None
+    if args.get("checkpoint"):
+        checkpoint = Checkpoint(args["checkpoint"], args.get("checkpoint_interval", 60))
+
+    def snapshot() -> Snapshot:
+        return {
+            "board": board,
+            "surface": surface,
+            "rule": args.get("rule", "B3/S23"),
+            "generation": iteration,
+            "detector": detector,
+            "cycle": cycle,
+        }
+
+    finished = False
+    try:
+        while iteration < max_iterations:
+            # Update
+            started = time.perf_counter()
+            board = update_function(board)
+
+            iteration += 1
+            if telemetry:
+                telemetry.step(iteration, board, time.perf_counter() - started)
+            if cycle is None:
+                cycle = detector.check(board, iteration)
+                if cycle and stop_after_cycle is not None:
+                    max_iterations = min(max_iterations, iteration + stop_after_cycle)
+            if checkpoint and checkpoint.due():
+                checkpoint.save(snapshot())
+            yield iteration, board, cycle
+        finished = True
+    finally:
+        if checkpoint and finished:
+            checkpoint.discard()
+        elif checkpoint:
+            checkpoint.save(snapshot(), wait=True)
+
+
+def offer(out: queue.Queue, item: object, stopped: threading.Event) -> bool:
+    """Put item in the queue once there's room. False if stopped first."""
+    while not stopped.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def simulate(
+    frames: Generator[Frame, None, None], out: queue.Queue, stopped: threading.Event
+) -> None:
+    """Queue the frames, then None, or the exception that stopped the simulation."""
+    item: object = None
+    try:
+        for frame in frames:
+            if not offer(out, frame, stopped):
+                return
+    except Exception as error:  # pylint: disable=broad-except
+        item = error
+    finally:
+        frames.close()
+    offer(out, item, stopped)
+
+
+def paced(
+    screen: Display, frames: Generator[Frame, None, None], args: OutputArgs
+) -> None:
+    """Simulate in a background thread and show a frame every --delay seconds.
+
+    The simulation runs at most --frame-queue generations ahead. When drawing falls
+    behind, the frames that are already overdue are dropped instead of drifting.
+    """
+    delay = args.get("delay", 1.0)
+    ready: queue.Queue = queue.Queue(maxsize=args["frame_queue"])
+    stopped = threading.Event()
+    producer = threading.Thread(
+        target=simulate, args=(frames, ready, stopped), daemon=True
+    )
+    producer.start()
+    frame_args: OutputArgs = {**args}
+    deadline = time.monotonic()
+    pending: list = []
+    try:
+        while True:
+            item = pending.pop() if pending else ready.get()
+            if isinstance(item, Exception):
+                raise item
+            if item is None:
+                return
+            late = time.monotonic() - deadline
+            if late < 0:
+                time.sleep(-late)
+            elif delay > 0 and late >= delay:
+                # Skip overdue frames, but always show the last one
+                for _ in range(int(late / delay)):
+                    if ready.empty():
+                        break
+                    following = ready.get()
+                    if not isinstance(following, tuple):
+                        pending.append(following)
+                        break
+                    if "telemetry" in args:
+                        args["telemetry"].rendered(item[0])
+                    item = following
+                    deadline += delay
+            iteration, board, cycle = item
+            if cycle:
+                frame_args["cycle"] = cycle
+            draw(screen, board, iteration, frame_args)
+            deadline += delay
+    finally:
+        stopped.set()
+        # Let the simulation save its checkpoint
+        producer.join()
+
+
+def cells_on_screen(args, columns: int, lines: int) -> tuple[int, int]:
+    """How many cells fit in columns by lines characters, with a line for the status."""
+    if args.glyphs in GLYPHS:
+        return 2 * columns, GLYPHS[args.glyphs][0] * (lines - 1)
+    return (columns if args.narrow else columns // 2), lines - 1
+
+
+def board_size(args) -> tuple[int, int]:
     # Use terminal width to find size
     try:
         width = args.width or int(subprocess.check_output(["tput", "cols"]))
         height = args.height or int(subprocess.check_output(["tput", "lines"]))
-        height -= 1
-        if not args.narrow:
-            width //= 2
     except:  # pylint: disable=bare-except
-        width, height = 32, 32
         print("Unable to find terminal size with Linux tput")
+        return 32, 32
+    return cells_on_screen(args, width, height)
+
+
+def screen_size(args) -> Optional[tuple[int, int]]:
+    """The cells that fit on the terminal, ignoring --width and --height."""
+    try:
+        columns = int(subprocess.check_output(["tput", "cols"]))
+        lines = int(subprocess.check_output(["tput", "lines"]))
+    except:  # pylint: disable=bare-except
+        return None
+    return cells_on_screen(args, columns, lines)
+
+
+def make_init_board(args, size: Optional[tuple[int, int]] = None) -> Board:
+    width, height = size or board_size(args)
     if args.empty_board:
         return empty(width, height)
     if args.file:
-        with open(args.file, encoding="utf-8") as boardfile:
-            init_board = parse(boardfile.readlines())
-            if args.expand_to_size:
-                return add(empty(width, height), init_board)
-            return init_board
+        init_board = read_pattern(args.file)
+        if args.expand_to_size:
+            return stamp(empty(width, height), init_board)
+        return init_board
     if args.random_board:
-        board = empty(width, height)
-        for y in range(height):
-            for x in range(width):
-                board[y][x] = random.choice([LIVE, DEAD, DEAD])
-        return board
+        return random_board(width, height, args.density)
     if args.glider_board:
         if width > height:
             width = height * (width // height)
@@ -366,16 +2487,87 @@ def make_init_board(args) -> Board:
     top = 2
     offset = 8
     board = empty(width, height)
-    direction = True
-    for y in range(top, height, offset):
-        board = add(
-            board,
-            shift(glider(up=direction, left=direction), x=width // 2, y=y),
-        )
-        direction = not direction
+    gliders = [glider(up=True, left=True), glider(up=False, left=False)]
+    for i, y in enumerate(range(top, height, offset)):
+        stamp(board, gliders[i % 2], x=width // 2, y=y)
     return board
 
 
+PATTERN_EXTENSIONS = (".txt", ".rle", ".cells")
+
+
+def play(args, output_args: OutputArgs) -> None:
+    """Run every pattern in --playlist and then a random board, over and over.
+
+    The terminal size is read once and again after the window is resized. The next
+    pattern is read in the background while the current one runs. Ctrl-C skips to
+    the next pattern, pressing it twice within a second quits.
+    """
+    # Read before the first pattern and after every resize
+    size: list[tuple[int, int]] = []
+
+    def resized(*_) -> None:
+        size.clear()
+
+    if hasattr(signal, "SIGWINCH"):
+        signal.signal(signal.SIGWINCH, resized)
+
+    def playlist() -> Iterator[Optional[str]]:
+        while True:
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(args.playlist)
+                for name in names
+                if name.lower().endswith(PATTERN_EXTENSIONS)
+            )
+            if args.shuffle:
+                random.shuffle(files)
+            yield from files
+            # None is a random board
+            yield None
+
+    entries = playlist()
+    skipped = 0.0
+    with ThreadPoolExecutor(max_workers=1) as reader:
+
+        def preload(path: Optional[str]):
+            return path, reader.submit(read_pattern, path) if path else None
+
+        upcoming = preload(next(entries))
+        while True:
+            path, pattern = upcoming
+            upcoming = preload(next(entries))
+            if not size:
+                size.append(board_size(args))
+                if args.follow:
+                    output_args["screen"] = screen_size(args) or size[0]
+            width, height = size[0]
+            if pattern is None:
+                board = random_board(width, height, args.density)
+            else:
+                try:
+                    board = pattern.result()
+                except (OSError, ValueError) as error:
+                    print(f"Skipping {path}: {error}")
+                    continue
+                if args.expand_to_size:
+                    board = stamp(empty(width, height), board)
+            try:
+                loop(
+                    board=board,
+                    max_iterations=args.iterations,
+                    surface=args.surface,
+                    args={
+                        **output_args,
+                        "name": os.path.basename(path) if path else "random",
+                    },
+                )
+            except KeyboardInterrupt:
+                if time.monotonic() - skipped < 1:
+                    raise
+                skipped = time.monotonic()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -392,14 +2584,103 @@ def main() -> None:
     )
     parser.add_argument(
         "--source",
-        choices=["python", "./variants/golf.py"],
+        choices=sources,
         default="python",
+        help="How to compute generations. hashlife needs --surface infinite.",
+    )
+    parser.add_argument(
+        "--step-exponent",
+        "-k",
+        type=int,
+        default=0,
+        help="Advance 2^k generations per step. Only used by --source hashlife.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Step horizontal strips of the board in this many processes. "
+        "Requires numpy, used by --source python and --source numpy.",
+    )
+    parser.add_argument(
+        "--stop-after-cycle",
+        type=int,
+        default=None,
+        help="Stop this many steps after the board dies or starts repeating.",
+    )
+    parser.add_argument(
+        "--rule",
+        "-r",
+        default="B3/S23",
+        help="Birth and survival neighbor counts, for example B36/S23 for HighLife.",
+    )
+    parser.add_argument(
+        "--frame-queue",
+        type=int,
+        default=0,
+        help="Simulate in a background thread up to this many steps ahead of the "
+        "display. Frames are shown every --delay seconds and dropped when drawing "
+        "falls behind.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Save the run to this file every --checkpoint-interval seconds and when "
+        "interrupted. If the file exists, resume from it instead of the given board. "
+        "It's removed when the run finishes.",
+    )
+    parser.add_argument("--checkpoint-interval", type=float, default=60)
+    parser.add_argument(
+        "--telemetry",
+        nargs="?",
+        const="",
+        help="Show population, births, deaths, bounding box, update and render times "
+        "in the status line. Also write every step to the given file, as CSV if it "
+        "ends in .csv and JSON lines otherwise.",
     )
     parser.add_argument("--name", default="")
     parser.add_argument("--pretty", "-p", action="store_true")
     parser.add_argument("--narrow", "-n", action="store_true")
     parser.add_argument("--color", "-c", default="off")
-    parser.add_argument("--output", "-o", choices=["neopixel", "cli"])
+    parser.add_argument(
+        "--output",
+        "-o",
+        choices=["neopixel", "neopixel-memory", "video", "cli"],
+        help="neopixel-memory draws NeoPixel frames into memory, to time them "
+        "without the hardware. video renders to --record as fast as possible.",
+    )
+    parser.add_argument(
+        "--record",
+        default="gameoflife.png",
+        help="File for --output video. .png files are animated PNGs, "
+        "other formats are encoded by ffmpeg. --delay sets the frame duration.",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=4, help="Pixels per cell for --output video."
+    )
+    parser.add_argument(
+        "--serpentine",
+        action="store_true",
+        help="The NeoPixel strip runs back and forth, right to left on odd rows.",
+    )
+    parser.add_argument(
+        "--redraw",
+        choices=["diff", "full"],
+        default="diff",
+        help="Only write changed cells with cursor movements, "
+        "or print every frame in full.",
+    )
+    parser.add_argument(
+        "--glyphs",
+        choices=["cells", "quadrants", "braille"],
+        default="cells",
+        help="Draw 2x2 (quadrants) or 2x4 (braille) cells per character. "
+        "Boards sized to the terminal get that many more cells.",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Show the part of a board larger than the terminal that has live cells.",
+    )
     parser.add_argument(
         "--width",
         "-w",
@@ -422,19 +2703,79 @@ def main() -> None:
         "--file",
         "-f",
         help="Dead cells and live cells are represented by "
-        f"the characters {DEAD_STR} and {LIVE_STR}",
+        f"the characters {DEAD_STR} and {LIVE_STR}. "
+        "Files ending in .rle or .cells are read as LifeWiki patterns.",
     )
     board_input.add_argument("BOARD", nargs="?")
     board_input.add_argument("--empty-board", action="store_true")
     board_input.add_argument("--random-board", action="store_true")
     board_input.add_argument("--glider-board", action="store_true")
+    board_input.add_argument(
+        "--playlist",
+        metavar="DIR",
+        help="Run every pattern file in this directory, then a random board, "
+        "over and over in one process.",
+    )
+    parser.add_argument(
+        "--shuffle", action="store_true", help="Shuffle each pass of --playlist."
+    )
+    parser.add_argument(
+        "--density",
+        type=float,
+        default=1 / 3,
+        help="The share of live cells on random boards.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed random boards and --shuffle to make runs reproducible.",
+    )
 
     args = parser.parse_args()
-
-    init_board = make_init_board(args)
+    try:
+        parse_rule(args.rule)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.playlist and args.checkpoint:
+        parser.error("--checkpoint can't be used with --playlist")
+
+    if args.source == "hashlife" and args.surface != "infinite":
+        parser.error("--source hashlife needs --surface infinite")
+    if args.step_exponent < 0:
+        parser.error("--step-exponent should be at least 0")
+
+    resume = None
+    init_board = None
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        try:
+            resume = load_snapshot(args.checkpoint)
+        except ValueError as error:
+            parser.error(str(error))
+        init_board = resume["board"]
+        args.surface = resume["surface"]
+        args.rule = resume["rule"]
+        if args.source == "hashlife" and args.surface != "infinite":
+            parser.error(
+                f"{args.checkpoint} is on a {args.surface} surface, "
+                "hashlife needs infinite"
+            )
+    if args.source in ("sparse", "hashlife") and parse_rule(args.rule)[0]:
+        parser.error(f"--source {args.source} can't run B0 rules like {args.rule}")
+    if not resume and not args.playlist:
+        try:
+            init_board = make_init_board(args)
+        except (OSError, ValueError) as error:
+            parser.error(f"{args.file}: {error}")
 
     output_args: OutputArgs = {
-        "name": "gliders" if args.glider_board else "random" if args.random_board else os.path.basename(args.file),
+        "name": "gliders"
+        if args.glider_board
+        else "random"
+        if args.random_board
+        else os.path.basename(args.file or ""),
         "source": args.source,
         "delay": float(args.delay),
         "start_delay": float(args.start_delay),
@@ -442,20 +2783,48 @@ def main() -> None:
         "narrow": bool(args.narrow),
         "color": "dynamic" if args.color == "on" else args.color,
         "output": args.output,
+        "serpentine": bool(args.serpentine),
+        "record": args.record,
+        "frame_queue": args.frame_queue,
+        "checkpoint": args.checkpoint,
+        "checkpoint_interval": args.checkpoint_interval,
+        "scale": args.scale,
+        "step_exponent": args.step_exponent if args.source == "hashlife" else 0,
+        "workers": args.workers,
+        "redraw": args.redraw,
+        "glyphs": args.glyphs,
+        "follow": bool(args.follow),
+        "rule": args.rule.upper(),
     }
+    if args.stop_after_cycle is not None:
+        output_args["stop_after_cycle"] = args.stop_after_cycle
+    if args.telemetry is not None:
+        output_args["telemetry"] = Telemetry(args.telemetry or None)
+    if args.follow and not args.playlist:
+        output_args["screen"] = screen_size(args) or board_size(args)
     try:
-        loop(
-            board=init_board,
-            max_iterations=args.iterations,
-            surface=args.surface,
-            args=output_args,
-        )
+        if args.playlist:
+            play(args, output_args)
+        else:
+            assert init_board is not None
+            loop(
+                board=init_board,
+                max_iterations=args.iterations,
+                surface=args.surface,
+                args=output_args,
+                resume=resume,
+            )
     except (EOFError, KeyboardInterrupt):
         return 1
     finally:
+        if "telemetry" in output_args:
+            output_args["telemetry"].close()
         if args.color:
             print(end=CLI.reset_color)
+        if args.redraw == "diff":
+            print()
     return 0
 
+
 if __name__ == "__main__":
     sys.exit(main())
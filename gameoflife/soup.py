@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Run random soups until they die or repeat and print one JSON line per board.
+
+Boards are stepped in batches of --batch as one NumPy array, the batches are
+spread over --workers processes. Batch i is made from seed --seed + i, so any
+board can be reproduced from its seed and index with gameoflife.random_batch.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+import gameoflife
+
+# pylint: disable=missing-function-docstring
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--boards", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=32)
+    parser.add_argument("--height", type=int, default=32)
+    parser.add_argument("--density", type=float, default=1 / 3)
+    parser.add_argument(
+        "--surface", default=gameoflife.surfaces[0], choices=gameoflife.surfaces
+    )
+    parser.add_argument("--rule", "-r", default="B3/S23")
+    parser.add_argument("--max-generations", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Append to this file instead of stdout.")
+    args = parser.parse_args()
+    try:
+        gameoflife.parse_rule(args.rule)
+    except ValueError as error:
+        parser.error(str(error))
+
+    batches = [
+        (
+            args.seed + i,
+            min(args.batch, args.boards - start),
+            args.height,
+            args.width,
+            args.density,
+            args.surface,
+            args.rule,
+            args.max_generations,
+        )
+        for i, start in enumerate(range(0, args.boards, args.batch))
+    ]
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with multiprocessing.Pool(args.workers) as pool:
+            for results in pool.imap_unordered(run_soups, batches):
+                for result in results:
+                    output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+def run_soups(batch: tuple) -> list[dict]:
+    return gameoflife.soup_results(*batch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""run_batch against CycleDetector and update(), one board at a time."""
+from typing import Optional
+
+import pytest
+
+import gameoflife
+
+numpy = pytest.importorskip("numpy")
+
+
+def to_board(cells) -> gameoflife.Board:
+    return gameoflife.Board.from_rows([[bool(cell) for cell in row] for row in cells])
+
+
+def reference(
+    board: gameoflife.Board, surface: gameoflife.Surface, max_generations: int
+) -> dict:
+    detector = gameoflife.CycleDetector(history=gameoflife.BATCH_HISTORY)
+    cycle: Optional[tuple[int, int]] = None
+    generation = 0
+    while True:
+        cycle = detector.check(board, generation)
+        if cycle or generation == max_generations:
+            break
+        board = gameoflife.update(board, surface)
+        generation += 1
+    period, start = cycle or (None, None)
+    return {
+        "population": board.population(),
+        "generation": generation,
+        "period": period,
+        "start": start,
+    }
+
+
+@pytest.mark.parametrize("surface", ["sphere", "rectangle"])
+def test_matches_cycle_detector(surface: gameoflife.Surface) -> None:
+    cells = gameoflife.random_batch(50, 16, 16, seed=1)
+    results = {
+        result.pop("index"): result
+        for result in gameoflife.run_batch(cells, surface, max_generations=2000)
+    }
+    assert sorted(results) == list(range(50))
+    for i, result in results.items():
+        assert result == reference(to_board(cells[i]), surface, 2000)
+
+
+def test_unfinished() -> None:
+    # A glider on a wrapping 16 by 16 board repeats every 64 generations
+    board = gameoflife.stamp(gameoflife.empty(16, 16), gameoflife.glider(True, True))
+    cells = numpy.array([[list(row) for row in board]], dtype=numpy.uint8)
+    (result,) = gameoflife.run_batch(cells, "sphere", max_generations=10)
+    assert result == {
+        "index": 0,
+        "population": 5,
+        "generation": 10,
+        "period": None,
+        "start": None,
+    }
+    (result,) = gameoflife.run_batch(cells, "sphere", max_generations=100)
+    assert (result["period"], result["start"]) == (64, 0)
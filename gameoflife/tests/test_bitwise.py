@@ -0,0 +1,52 @@
+"""variants/bitwise.py against gameoflife.update on random boards."""
+import importlib.util
+import os
+import random
+
+import pytest
+
+import gameoflife
+
+VARIANTS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "variants"
+)
+
+
+def load_bitwise():
+    spec = importlib.util.spec_from_file_location(
+        "bitwise", os.path.join(VARIANTS, "bitwise.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    "width,height", [(1, 1), (3, 5), (8, 8), (31, 17), (32, 32), (65, 40)]
+)
+@pytest.mark.parametrize("density", [0.1, 1 / 3, 0.7])
+def test_step_matches_update(width: int, height: int, density: float) -> None:
+    step = load_bitwise().step
+    board = gameoflife.random_board(
+        width, height, density, random.Random(width * height)
+    )
+    rows = [board.row_bits(y) for y in range(height)]
+    for _ in range(10):
+        rows = step(rows, width)
+        board = gameoflife.update(board, "rectangle")
+        assert rows == [board.row_bits(y) for y in range(height)]
+
+
+def test_worker_matches_update() -> None:
+    board = gameoflife.random_board(50, 30, rng=random.Random(0))
+    engine = gameoflife.ExternalEngine(
+        "rectangle", os.path.join(VARIANTS, "bitwise.py")
+    )
+    expected = board
+    try:
+        for _ in range(10):
+            board = engine(board)
+            expected = gameoflife.update(expected, "rectangle")
+            assert board == expected
+    finally:
+        engine.close()
@@ -0,0 +1,160 @@
+"""The bit-packed Board, its row views and the functions that combine boards."""
+import random
+
+import pytest
+
+import gameoflife
+from gameoflife import Board
+
+D, L = gameoflife.DEAD, gameoflife.LIVE
+
+
+def from_text(text: str) -> Board:
+    return Board.from_rows([[cell == "#" for cell in row] for row in text.split()])
+
+
+def to_text(board: Board) -> str:
+    return gameoflife.show(board, ("#", "."))
+
+
+def test_from_rows_and_back() -> None:
+    rows = [[L, D, D], [D, D, L]]
+    board = Board.from_rows(rows)
+    assert (board.width, board.height, board.stride) == (3, 2, 1)
+    assert [list(row) for row in board] == rows
+    assert Board.from_rows(board) is board
+
+
+def test_equal_to_lists() -> None:
+    rows = [[L, D, L], [D, L, D]]
+    board = Board.from_rows(rows)
+    assert board == rows
+    assert rows == board
+    assert board[1] == [D, L, D]
+    assert board != [[L, D, L]]
+    assert board != [[L, D, L], [D, L, L]]
+    assert board == Board.from_rows([list(row) for row in rows])
+    assert board != Board.from_rows([[L, D, L, D], [D, L, D, D]])
+
+
+def test_ragged_rows_are_padded() -> None:
+    board = Board.from_rows([[L], [D, D, L]])
+    assert to_text(board) == "#..\n..#"
+
+
+def test_cells() -> None:
+    board = gameoflife.empty(13, 3)
+    board[1][12] = True
+    board[-1][-13] = True
+    assert board[1][12] and board[2][0]
+    assert board.row_bits(1) == 1 << 12
+    assert board.population() == 2
+    board[1][12] = False
+    assert board.population() == 1
+    with pytest.raises(IndexError):
+        board[0][13]
+    with pytest.raises(IndexError):
+        board[3]
+    assert board[0:2] == [[D] * 13, [D] * 13]
+
+
+@pytest.mark.parametrize("width", [1, 7, 8, 9, 13, 16, 31])
+def test_row_bits_stay_inside_the_width(width: int) -> None:
+    board = gameoflife.empty(width, 2)
+    board.set_row_bits(0, -1)
+    assert board.population() == width
+    assert board.row_bits(0) == (1 << width) - 1
+    assert board.row_bits(1) == 0
+    assert list(board[0]) == [L] * width
+
+
+@pytest.mark.parametrize("width", [1, 7, 8, 9, 13, 31])
+def test_random_board_padding_is_clear(width: int) -> None:
+    board = gameoflife.random_board(width, 5, density=1)
+    assert board.population() == 5 * width
+
+
+def test_add_operators() -> None:
+    board = from_text("##.. #.#.")
+    other = from_text(".##. ....")
+    assert to_text(gameoflife.add(board, other)) == "###.\n#.#."
+    assert to_text(gameoflife.add(board, other, bool.__and__)) == ".#..\n...."
+    assert to_text(gameoflife.add(board, other, bool.__xor__)) == "#.#.\n#.#."
+    # Any other operator goes cell by cell
+    assert to_text(gameoflife.add(board, other, lambda a, b: a and not b)) == (
+        "#...\n#.#."
+    )
+
+
+def test_add_lists_and_other_sizes() -> None:
+    board = gameoflife.empty(10, 3)
+    grown = gameoflife.add(board, [[L] * 12, [D, L]])
+    assert to_text(grown) == "##########\n.#........\n.........."
+    # The inputs are unchanged
+    assert board.population() == 0
+
+
+def test_stamp_in_place() -> None:
+    board = gameoflife.empty(9, 5)
+    glider = gameoflife.glider(up=True, left=True)
+    assert gameoflife.stamp(board, glider, 6, 1) is board
+    assert to_text(board) == "\n".join(
+        [".........", ".......#.", "......##.", "......#.#", "........."]
+    )
+
+
+@pytest.mark.parametrize(
+    "x,y,expected",
+    [
+        (-1, 0, "#...\n#...\n.#.."),
+        (0, -2, "#.#.\n....\n...."),
+        (-2, -1, "....\n#...\n...."),
+        (2, 1, "....\n...#\n..##"),
+        (5, 0, "....\n....\n...."),
+        (0, 3, "....\n....\n...."),
+    ],
+)
+def test_stamp_clips_at_the_edges(x: int, y: int, expected: str) -> None:
+    glider = gameoflife.glider(up=True, left=True)
+    assert to_text(gameoflife.stamp(gameoflife.empty(4, 3), glider, x, y)) == expected
+
+
+def test_shift() -> None:
+    board = from_text("#. .#")
+    assert to_text(gameoflife.shift(board, 1, 2)) == "....\n..#.\n...#"
+    assert to_text(gameoflife.shift(board, -1, -1)) == "#..\n.#.\n..."
+    assert to_text(gameoflife.shift([[L]], 0, 0)) == "#"
+    # A new board, the old one is unchanged
+    assert gameoflife.shift(board) is not board
+    assert to_text(board) == "#.\n.#"
+
+
+@pytest.mark.parametrize(
+    "x,y,expected",
+    [
+        (0, 0, "#.\n.#"),
+        (1, 1, "#.\n.#"),
+        (-1, -1, "..\n.#"),
+        (2, 1, "..\n#."),
+        (3, 3, "#.\n.."),
+        (4, 0, "..\n.."),
+    ],
+)
+def test_crop(x: int, y: int, expected: str) -> None:
+    board = from_text("#... .#.. ..#. ...#")
+    assert to_text(gameoflife.crop(board, x, y, 2, 2)) == expected
+
+
+def test_crop_across_bytes() -> None:
+    board = gameoflife.random_board(37, 11, rng=random.Random(7))
+    window = gameoflife.crop(board, 5, 3, 30, 6)
+    for y in range(6):
+        assert list(window[y]) == list(board[y + 3])[5:35]
+
+
+def test_bounding_box() -> None:
+    assert gameoflife.bounding_box(gameoflife.empty(9, 9)) is None
+    board = gameoflife.stamp(
+        gameoflife.empty(20, 9), gameoflife.glider(True, True), 11, 4
+    )
+    assert gameoflife.bounding_box(board) == (11, 4, 13, 6)
@@ -0,0 +1,102 @@
+"""Every engine against gameoflife.update on random boards."""
+import random
+
+import pytest
+
+import gameoflife
+
+SURFACES: list[gameoflife.Surface] = ["sphere", "rectangle", "torus"]
+RULES = ["B3/S23", "B36/S23", "B2/S"]
+
+
+def random_boards():
+    for width, height in [(1, 1), (7, 5), (16, 16), (33, 20)]:
+        rng = random.Random(width * height)
+        yield gameoflife.random_board(width, height, rng=rng)
+
+
+def check_against_update(
+    engine, surface: gameoflife.Surface, rule: str, generations: int = 8
+) -> None:
+    rule_table = gameoflife.parse_rule(rule)
+    for board in random_boards():
+        expected = board
+        for _ in range(generations):
+            board = engine(board)
+            expected = gameoflife.update(expected, surface, rule_table)
+            assert board == expected
+
+
+@pytest.fixture
+def numpy():
+    return pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize("surface", SURFACES)
+@pytest.mark.parametrize("rule", RULES)
+def test_numpy(numpy, surface: gameoflife.Surface, rule: str) -> None:
+    engine = gameoflife.NumpyEngine(surface, gameoflife.parse_rule(rule))
+    check_against_update(engine, surface, rule)
+
+
+@pytest.mark.parametrize(
+    "source", [s for s in gameoflife.sources if not s.startswith("./variants")]
+)
+def test_pick_updater(source: str) -> None:
+    surface: gameoflife.Surface = "infinite" if source == "hashlife" else "sphere"
+    if source == "numpy":
+        pytest.importorskip("numpy")
+    updater = gameoflife.pick_updater(source, surface)
+    try:
+        board = gameoflife.random_board(10, 10, rng=random.Random(0))
+        assert updater(board).width == 10
+    finally:
+        if hasattr(updater, "close"):
+            updater.close()
+
+
+@pytest.mark.parametrize("surface", SURFACES)
+@pytest.mark.parametrize("rule", RULES)
+def test_sparse(surface: gameoflife.Surface, rule: str) -> None:
+    engine = gameoflife.SparseEngine(surface, gameoflife.parse_rule(rule))
+    check_against_update(engine, surface, rule)
+
+
+@pytest.mark.parametrize("surface", SURFACES)
+def test_tiled(numpy, surface: gameoflife.Surface) -> None:
+    engine = gameoflife.TiledEngine(surface, 2)
+    try:
+        check_against_update(engine, surface, "B3/S23")
+    finally:
+        engine.close()
+
+
+@pytest.mark.parametrize("surface", SURFACES)
+@pytest.mark.parametrize("rule", RULES)
+def test_lut(surface: gameoflife.Surface, rule: str) -> None:
+    engine = gameoflife.LutEngine(surface, gameoflife.parse_rule(rule))
+    check_against_update(engine, surface, rule)
+
+
+@pytest.mark.parametrize("step_exponent", [0, 3])
+def test_hashlife_matches_sparse(step_exponent: int) -> None:
+    rule = gameoflife.CONWAY
+    hashlife = gameoflife.HashLifeEngine("infinite", rule, step_exponent=step_exponent)
+    sparse = gameoflife.SparseEngine("infinite", rule)
+    for board in random_boards():
+        expected = board
+        for _ in range(4):
+            board = hashlife(board)
+            for _ in range(1 << step_exponent):
+                expected = sparse(expected)
+            assert board == expected
+
+
+def test_hashlife_needs_infinite() -> None:
+    with pytest.raises(ValueError):
+        gameoflife.pick_updater("hashlife", "sphere")
+
+
+def test_hashlife_negative_step_exponent() -> None:
+    with pytest.raises(ValueError):
+        gameoflife.HashLifeEngine("infinite", step_exponent=-1)
@@ -0,0 +1,22 @@
+"""Reading .cells and .rle pattern files."""
+import gameoflife
+
+
+def test_cells_any_live_character() -> None:
+    lines = ["!Name: glider", "!", ".o.", "..O", "*#x"]
+    width, height, data = gameoflife.parse_cells(lines)
+    board = gameoflife.unpack(width, height, data)
+    assert gameoflife.show(board, ("#", ".")) == ".#.\n..#\n###"
+
+
+def test_cells_short_rows() -> None:
+    width, height, data = gameoflife.parse_cells(["O", "", "..O"])
+    board = gameoflife.unpack(width, height, data)
+    assert gameoflife.show(board, ("#", ".")) == "#..\n...\n..#"
+
+
+def test_rle_glider() -> None:
+    lines = ["#N Glider", "x = 3, y = 3, rule = B3/S23", "bob$2bo$3o!"]
+    width, height, data = gameoflife.parse_rle(lines)
+    board = gameoflife.unpack(width, height, data)
+    assert gameoflife.show(board, ("#", ".")) == ".#.\n..#\n###"
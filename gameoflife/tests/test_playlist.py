@@ -0,0 +1,52 @@
+"""--playlist with pattern files that can't be read."""
+import sys
+
+import pytest
+
+import gameoflife
+
+
+class Played(Exception):
+    pass
+
+
+def test_skips_bad_patterns(tmp_path, monkeypatch, capsys) -> None:
+    (tmp_path / "blank.txt").write_text("\n\n")
+    (tmp_path / "headless.rle").write_text("bo$2bo$3o!\n")
+    (tmp_path / "glider.cells").write_text("!Name: glider\n.O.\n..O\nOOO\n")
+    names: list[str] = []
+
+    def loop(board, max_iterations, surface, args) -> None:
+        names.append(args["name"])
+        if len(names) == 2:
+            raise Played
+
+    monkeypatch.setattr(gameoflife, "loop", loop)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "gameoflife.py",
+            "--playlist",
+            str(tmp_path),
+            "--width",
+            "20",
+            "--height",
+            "9",
+        ],
+    )
+    with pytest.raises(Played):
+        gameoflife.main()
+    # Every good pattern, then a random board
+    assert names == ["glider.cells", "random"]
+    output = capsys.readouterr().out
+    assert "blank.txt: empty board" in output
+    assert "headless.rle: RLE header missing" in output
+
+
+def test_bad_file(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "blank.txt"
+    path.write_text("")
+    monkeypatch.setattr(sys, "argv", ["gameoflife.py", "--file", str(path)])
+    with pytest.raises(SystemExit):
+        gameoflife.main()
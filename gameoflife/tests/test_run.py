@@ -0,0 +1,72 @@
+"""The simulation loop with a frame queue."""
+import csv
+import random
+import threading
+import time
+
+import pytest
+
+import gameoflife
+
+
+class Interrupted(gameoflife.Display):
+    """Raises KeyboardInterrupt while drawing the first step, slowly."""
+
+    def display(self, board, iteration, args) -> None:
+        if iteration > 0:
+            # Let the simulation fill the queue and finish
+            time.sleep(0.3)
+            raise KeyboardInterrupt
+
+
+def run_in_thread(screen: gameoflife.Display, max_iterations: int, args) -> list:
+    errors: list = []
+
+    def target() -> None:
+        try:
+            board = gameoflife.random_board(20, 20, rng=random.Random(0))
+            gameoflife.run(screen, board, max_iterations, "torus", args)
+        except BaseException as error:  # pylint: disable=broad-except
+            errors.append(error)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive(), "run() did not return"
+    return errors
+
+
+@pytest.mark.parametrize("frame_queue", [1, 2, 5])
+def test_interrupt_with_full_queue(frame_queue: int) -> None:
+    errors = run_in_thread(Interrupted(), 3, {"frame_queue": frame_queue, "delay": 0})
+    assert len(errors) == 1 and isinstance(errors[0], KeyboardInterrupt)
+
+
+def test_shows_every_frame() -> None:
+    class Frames(gameoflife.Display):
+        def __init__(self) -> None:
+            self.shown: list[int] = []
+
+        def display(self, board, iteration, args) -> None:
+            self.shown.append(iteration)
+
+    screen = Frames()
+    assert not run_in_thread(screen, 10, {"frame_queue": 2, "delay": 0})
+    assert screen.shown == list(range(1, 11))
+
+
+def test_telemetry_with_long_queue(tmp_path) -> None:
+    class Slow(gameoflife.Display):
+        def display(self, board, iteration, args) -> None:
+            # Let the simulation run a full queue ahead
+            time.sleep(0.001)
+
+    path = str(tmp_path / "telemetry.csv")
+    telemetry = gameoflife.Telemetry(path)
+    frame_queue = 2 * gameoflife.TELEMETRY_HISTORY
+    args = {"frame_queue": frame_queue, "delay": 0, "telemetry": telemetry}
+    assert not run_in_thread(Slow(), 3 * frame_queue, args)
+    telemetry.close()
+    with open(path, encoding="utf-8") as records:
+        iterations = [int(record["iteration"]) for record in csv.DictReader(records)]
+    assert sorted(iterations) == list(range(1, 3 * frame_queue + 1))
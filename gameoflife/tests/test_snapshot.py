@@ -0,0 +1,80 @@
+"""Saving and loading --checkpoint snapshots."""
+import random
+
+import pytest
+
+import gameoflife
+
+
+def make_snapshot(
+    width: int = 21, height: int = 13, steps: int = 40
+) -> gameoflife.Snapshot:
+    board = gameoflife.random_board(width, height, rng=random.Random(width))
+    detector = gameoflife.CycleDetector(history=16)
+    cycle = None
+    for generation in range(steps):
+        cycle = cycle or detector.check(board, generation)
+        board = gameoflife.update(board, "torus")
+    return {
+        "board": board,
+        "surface": "torus",
+        "rule": "B36/S23",
+        "generation": steps,
+        "detector": detector,
+        "cycle": cycle,
+    }
+
+
+def save(tmp_path, data: bytes) -> str:
+    path = str(tmp_path / "snapshot.gol")
+    gameoflife.write_atomically(path, data)
+    return path
+
+
+@pytest.mark.parametrize("width,height", [(1, 1), (21, 13), (64, 8)])
+def test_round_trip(tmp_path, width: int, height: int) -> None:
+    snapshot = make_snapshot(width, height)
+    loaded = gameoflife.load_snapshot(
+        save(tmp_path, gameoflife.dump_snapshot(snapshot))
+    )
+    assert loaded["board"] == snapshot["board"]
+    assert (loaded["board"].width, loaded["board"].height) == (width, height)
+    for key in ("surface", "rule", "generation", "cycle"):
+        assert loaded[key] == snapshot[key]
+    assert list(loaded["detector"].order) == list(snapshot["detector"].order)
+    assert loaded["detector"].seen == snapshot["detector"].seen
+
+
+def test_round_trip_cycle(tmp_path) -> None:
+    snapshot = make_snapshot()
+    snapshot["cycle"] = (2, 17)
+    loaded = gameoflife.load_snapshot(
+        save(tmp_path, gameoflife.dump_snapshot(snapshot))
+    )
+    assert loaded["cycle"] == (2, 17)
+
+
+def test_bad_magic(tmp_path) -> None:
+    data = b"XXXX" + gameoflife.dump_snapshot(make_snapshot())[4:]
+    with pytest.raises(ValueError, match="not a Game of Life snapshot"):
+        gameoflife.load_snapshot(save(tmp_path, data))
+
+
+@pytest.mark.parametrize("cut", [1, gameoflife.SNAPSHOT_ENTRY.size + 1, 100])
+def test_truncated(tmp_path, cut: int) -> None:
+    data = gameoflife.dump_snapshot(make_snapshot())
+    with pytest.raises(ValueError):
+        gameoflife.load_snapshot(save(tmp_path, data[:-cut]))
+
+
+def test_too_short_for_header(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        gameoflife.load_snapshot(save(tmp_path, gameoflife.SNAPSHOT_MAGIC))
+
+
+def test_bad_surface(tmp_path) -> None:
+    data = bytearray(gameoflife.dump_snapshot(make_snapshot()))
+    # The surface index follows the magic and version
+    data[6:8] = (len(gameoflife.surfaces)).to_bytes(2, "little")
+    with pytest.raises(ValueError, match="unknown surface"):
+        gameoflife.load_snapshot(save(tmp_path, bytes(data)))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""The Game of Life on rows of bits, for any board size.
+
+Same rules as golf.py: every cell outside the grid is dead. Each row is an integer
+with cell x at bit x. The eight neighbors of a whole row are summed at once with
+full adders, one bit of the count per integer, so a row costs a few dozen integer
+operations however wide it is.
+
+Run by variants/worker.py, which calls step() directly. As a script it reads the
+board from sys.argv[1] like golf.py ("#" live, "." dead) and prints the next one.
+"""
+import sys
+
+
+def full_adder(a: int, b: int, c: int) -> tuple[int, int]:
+    """Sum and carry of three rows of bits."""
+    partial = a ^ b
+    return partial ^ c, (a & b) | (partial & c)
+
+
+def step(rows: list[int], width: int) -> list[int]:
+    mask = (1 << width) - 1
+    # Each row with its left and right neighbors moved into place
+    shifted = [((row << 1) & mask, row, row >> 1) for row in rows]
+    edge = (0, 0, 0)
+    new_rows = []
+    for y, row in enumerate(rows):
+        above = shifted[y - 1] if y > 0 else edge
+        below = shifted[y + 1] if y + 1 < len(rows) else edge
+        left, _, right = shifted[y]
+        # Ones of the count from three adders, the twos from their carries
+        ones_above, twos_above = full_adder(*above)
+        ones_below, twos_below = full_adder(*below)
+        ones_middle, twos_middle = left ^ right, left & right
+        ones, twos_ones = full_adder(ones_above, ones_below, ones_middle)
+        twos_partial, fours = full_adder(twos_above, twos_below, twos_middle)
+        twos = twos_partial ^ twos_ones
+        fours |= twos_partial & twos_ones
+        # Two neighbors keep a live cell alive, three make a cell live
+        new_rows.append(twos & ~fours & (ones | row))
+    return new_rows
+
+
+def main() -> None:
+    lines = [line.strip() for line in sys.argv[1].split("\n") if line.strip()]
+    width = max(len(line) for line in lines)
+    rows = [sum(1 << x for x, cell in enumerate(line) if cell == "#") for line in lines]
+    for row in step(rows, width):
+        print("".join("#" if row >> x & 1 else "." for x in range(width)))
+
+
+if __name__ == "__main__":
+    main()
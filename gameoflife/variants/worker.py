@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Run a Game of Life variant as a persistent worker.
+
+Usage: worker.py VARIANT
+
+Start once, then read frames from stdin and write generations to stdout.
+Every frame starts with a little-endian header of three 32-bit integers:
+
+    width (signed), height, generations
+
+followed by height rows of ceil(width / 8) bytes. Cell x of a row is bit x of the
+row read as a little-endian integer.
+
+Requests: a frame with a board, or width -1 and no rows to continue from the last
+board sent back. The worker answers with one frame per requested generation.
+
+Variants that define a top-level `step(rows, width)` taking and returning rows as
+integer bitmasks are called directly. Any other script is treated like
+variants/golf.py: it is compiled once and run in-process with the board as
+sys.argv[1] ("#" live, "." dead), printing the next board to stdout.
+Executables (*.bin) are still started once per generation.
+"""
+import ast
+import contextlib
+import io
+import string
+import struct
+import subprocess
+import sys
+from typing import Any, Callable
+
+FRAME = struct.Struct("<iII")
+LIVE = "#@&" + string.ascii_uppercase
+
+Rows = list[int]
+
+
+def encode(rows: Rows, width: int) -> str:
+    return "\n".join(
+        "".join("#" if row >> x & 1 else "." for x in range(width)) for row in rows
+    )
+
+
+def decode(output: str) -> tuple[Rows, int]:
+    lines = [line.strip() for line in output.split("\n") if line.strip()]
+    rows = [
+        sum(1 << x for x, cell in enumerate(line) if cell in LIVE) for line in lines
+    ]
+    return rows, max(len(line) for line in lines)
+
+
+def load(path: str) -> Callable[[Rows, int], tuple[Rows, int]]:
+    if not path.endswith(".py"):
+
+        def run_binary(rows: Rows, width: int) -> tuple[Rows, int]:
+            return decode(
+                subprocess.check_output([path, encode(rows, width)]).decode("utf-8")
+            )
+
+        return run_binary
+
+    with open(path, encoding="utf-8") as source_file:
+        source = source_file.read()
+    tree = ast.parse(source, path)
+    if any(
+        isinstance(node, ast.FunctionDef) and node.name == "step" for node in tree.body
+    ):
+        module: dict[str, Any] = {"__name__": "variant", "__file__": path}
+        exec(compile(tree, path, "exec"), module)  # pylint: disable=exec-used
+        variant_step = module["step"]
+
+        def run_step(rows: Rows, width: int) -> tuple[Rows, int]:
+            return variant_step(rows, width), width
+
+        return run_step
+
+    code = compile(tree, path, "exec")
+
+    def run_script(rows: Rows, width: int) -> tuple[Rows, int]:
+        sys.argv = [path, encode(rows, width)]
+        output = io.StringIO()
+        script = {"__name__": "__main__", "__file__": path}
+        with contextlib.redirect_stdout(output):
+            exec(code, script)  # pylint: disable=exec-used
+        return decode(output.getvalue())
+
+    return run_script
+
+
+def read_exactly(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError
+    return data
+
+
+def main() -> int:
+    step = load(sys.argv[1])
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    rows: Rows = []
+    width = 0
+    while True:
+        try:
+            new_width, height, generations = FRAME.unpack(
+                read_exactly(stdin, FRAME.size)
+            )
+            if new_width >= 0:
+                width = new_width
+                stride = (width + 7) // 8
+                data = read_exactly(stdin, stride * height)
+                rows = [
+                    int.from_bytes(data[y * stride : (y + 1) * stride], "little")
+                    for y in range(height)
+                ]
+        except EOFError:
+            return 0
+        for _ in range(generations):
+            rows, width = step(rows, width)
+            stride = (width + 7) // 8
+            stdout.write(FRAME.pack(width, len(rows), 1))
+            stdout.write(b"".join(row.to_bytes(stride, "little") for row in rows))
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,37 @@
 import logging
+import threading
 import time
 from collections import deque
-from copy import deepcopy
+from typing import NamedTuple, Tuple
 
 import numpy as np
 import pyaudio
 from numpy.typing import NDArray
 from scipy.signal import find_peaks
 
+# PyAudio's integer formats are signed
 PYAUDIO_TO_NUMPY_FORMAT = {
-    pyaudio.paInt8: np.uint8,
-    pyaudio.paInt16: np.uint16,
-    pyaudio.paInt32: np.uint32,
+    pyaudio.paInt8: np.int8,
+    pyaudio.paInt16: np.int16,
+    pyaudio.paInt32: np.int32,
 }
 
 MAX_NOTABLE_FREQUENCIES = 4
 
-MAX_ECHO_BUFFER = 1000
+# Frames kept for the analysis and the echo, about 3 seconds at 44100Hz
+RING_FRAMES = 256
+
+# Spectra kept by the STFT
+SPECTROGRAM_HISTORY = 256
+
+# Peaks of this many recent spectra go into every Analysis
+PEAK_HISTORY = 64
+
+WINDOW_FUNCTIONS = {
+    "hann": np.hanning,
+    "blackman": np.blackman,
+    "rectangular": np.ones,
+}
 
 
 def check_status(status):
@@ -35,8 +50,159 @@ def sort_notable(ix, y):
     )
 
 
+class Analysis(NamedTuple):
+    """What the visualizations draw, published whole by the analysis thread.
+
+    Levels are in dB relative to the full scale of the sample format.
+    """
+
+    # Spectra computed so far
+    spectra: int
+    # Filtered magnitudes of the latest spectrum, read-only
+    y: NDArray[np.float64]
+    max_y: float
+    # Sorted peaks of y as (indices, magnitudes)
+    peaks: Tuple[NDArray, NDArray]
+    # Peak indices of the last PEAK_HISTORY spectra, oldest first
+    recent_peaks: Tuple[NDArray, ...]
+    rms_level: float
+    peak_level: float
+
+
+class Slot:
+    """The latest value from one writer thread, with a version that counts publishes.
+
+    Both are swapped in with a single assignment, so readers never see a mix of two
+    values and never block the writer.
+    """
+
+    def __init__(self, value):
+        self.current = (0, value)
+
+    def publish(self, value):
+        self.current = (self.current[0] + 1, value)
+
+    def read(self):
+        """(version, value)"""
+        return self.current
+
+
+def decibels(ratio):
+    return 20 * np.log10(max(ratio, 1e-10))
+
+
+class FrameRing:
+    """The last few frames of audio in one preallocated array.
+
+    One thread writes: each frame is copied into the next slot, then `written`
+    is incremented. Readers copy a frame out and then check `written` again. If
+    the writer reached that slot in the meantime the copy may be torn and is
+    rejected, so no locks are needed on the audio thread.
+    """
+
+    def __init__(self, frames, frame_size, dtype):
+        self.frames = np.zeros((frames, frame_size), dtype=dtype)
+        # Frames written since the start, only changed by the writer
+        self.written = 0
+
+    def write(self, data):
+        self.frames[self.written % len(self.frames)] = np.frombuffer(
+            data, dtype=self.frames.dtype
+        )
+        self.written += 1
+
+    def read(self, index, out):
+        """Copy frame number index into out. False if it's not there or was overwritten."""
+        if not 0 <= index < self.written or self.written - index >= len(self.frames):
+            return False
+        out[:] = self.frames[index % len(self.frames)]
+        return self.written - index < len(self.frames)
+
+    def oldest_sample(self):
+        """The first sample that can still be read safely."""
+        return max(0, self.written - len(self.frames) + 1) * self.frames.shape[1]
+
+    def read_samples(self, start, out):
+        """Copy len(out) samples from sample number start on, across frames.
+
+        False if they haven't all been written or some were overwritten.
+        """
+        end = start + len(out)
+        if start < self.oldest_sample() or end > self.written * self.frames.shape[1]:
+            return False
+        samples = self.frames.reshape(-1)
+        begin = start % len(samples)
+        first = min(len(out), len(samples) - begin)
+        out[:first] = samples[begin : begin + first]
+        out[first:] = samples[: len(out) - first]
+        return start >= self.oldest_sample()
+
+
+class STFT:
+    """Spectra of overlapping windows of the capture ring, one every hop samples.
+
+    Windows are zero-padded to a power of two FFT size. The magnitudes go into
+    rows of a preallocated spectrogram, used as a ring of SPECTROGRAM_HISTORY rows.
+    If the ring moves on before a window is read, those windows are skipped.
+    """
+
+    # Window arrays by function and length
+    windows = {}
+
+    def __init__(self, rate, dtype, length=2048, hop=512, window="hann"):
+        self.length = length
+        self.hop = hop
+        self.fft_size = 1 << (length - 1).bit_length()
+        self.window = self.get_window(window, length)
+        self.samples = np.zeros(length, dtype=dtype)
+        # The end stays zero for padding
+        self.windowed = np.zeros(self.fft_size)
+        self.frequencies = np.fft.rfftfreq(self.fft_size, 1 / rate)
+        self.spectrogram = np.zeros((SPECTROGRAM_HISTORY, len(self.frequencies)))
+        # Spectra computed so far, the last one is in row (spectra - 1) % history
+        self.spectra = 0
+        # First sample of the next window
+        self.position = 0
+        self.skipped = 0
+
+    @classmethod
+    def get_window(cls, window, length):
+        if (window, length) not in cls.windows:
+            cls.windows[window, length] = WINDOW_FUNCTIONS[window](length)
+        return cls.windows[window, length]
+
+    def update(self, ring):
+        """Compute the spectra of every full window in the ring. Returns how many."""
+        oldest = ring.oldest_sample()
+        if self.position < oldest:
+            behind = -(-(oldest - self.position) // self.hop)
+            self.position += behind * self.hop
+            self.skipped += behind
+        new = 0
+        while self.position + self.length <= ring.written * ring.frames.shape[1]:
+            if ring.read_samples(self.position, self.samples):
+                np.multiply(self.samples, self.window, out=self.windowed[: self.length])
+                row = self.spectrogram[self.spectra % len(self.spectrogram)]
+                row[:] = np.abs(np.fft.rfft(self.windowed))
+                self.spectra += 1
+                new += 1
+            else:
+                self.skipped += 1
+            self.position += self.hop
+        return new
+
+    def latest(self):
+        return self.spectrogram[(self.spectra - 1) % len(self.spectrogram)]
+
+    def recent(self, count):
+        """The last count spectra, oldest first, at most SPECTROGRAM_HISTORY."""
+        count = min(count, self.spectra, len(self.spectrogram))
+        rows = np.arange(self.spectra - count, self.spectra) % len(self.spectrogram)
+        return self.spectrogram[rows]
+
+
 class AudioInput:
-    def __init__(self):
+    def __init__(self, window_length=2048, hop=512, window="hann"):
         self.frames_per_buffer = 512
 
         self.pyaudio_obj = pyaudio.PyAudio()
@@ -47,13 +213,20 @@ class AudioInput:
             self.pyaudio_obj.get_default_input_device_info()["defaultSampleRate"]
         )
 
-        self.input_buffer = None
-        self.output_buffer = None
-
         # TODO fix 8 bit
         self.format = pyaudio.paInt32
         self.np_format = PYAUDIO_TO_NUMPY_FORMAT[self.format]
 
+        # Filled by receive_audio, read by the analysis thread and send_audio
+        self.ring = FrameRing(RING_FRAMES, self.frames_per_buffer, self.np_format)
+        # Only used by the analysis thread
+        self.stft = STFT(self.rate, self.np_format, window_length, hop, window)
+        self.recent_peaks = deque(maxlen=PEAK_HISTORY)
+        self.full_scale = np.iinfo(self.np_format).max
+        self.echo_frame = np.zeros(self.frames_per_buffer, dtype=self.np_format)
+        self.silence = bytes(self.echo_frame.nbytes)
+        self.input_frame_count = None
+
         logging.info(
             "Device info: %s", self.pyaudio_obj.get_default_input_device_info()
         )
@@ -82,9 +255,8 @@ class AudioInput:
         # Whether to echo the input to the output device
         self.echo = True
 
-        # Don't play until X seconds have gone by...
+        # Play the input from this long ago, at most RING_FRAMES - 2 frames
         self.echo_delay_seconds = 0
-        self.echo_buffer = deque()
 
         self.output_frame_count = None
         self.output_time = None
@@ -108,16 +280,31 @@ class AudioInput:
         else:
             self.out_stream = None
 
-        self.x: NDArray[np.float64] = self.filter(
-            np.fft.rfftfreq(self.frames_per_buffer, 1 / self.rate)
-        )
+        self.x: NDArray[np.float64] = self.filter(self.stft.frequencies)
         self.max_ix = len(self.x)
         self.max_x = max(self.x)
         self.min_x = min(self.x)
-        self.y: NDArray[np.float64] = np.random.rand(self.max_ix)
-        self.max_y = 1
         self.min_y = 0.25
 
+        empty = np.zeros(0, dtype=np.intp)
+        silence = np.zeros(self.max_ix)
+        silence.flags.writeable = False
+        self.analysis = Slot(
+            Analysis(
+                spectra=0,
+                y=silence,
+                max_y=1.0,
+                peaks=(empty, silence[:0]),
+                recent_peaks=(),
+                rms_level=decibels(0),
+                peak_level=decibels(0),
+            )
+        )
+        self.stopped = threading.Event()
+        self.analyser = threading.Thread(
+            target=self.analyse_forever, name="analysis", daemon=True
+        )
+
     def print_all_device_info(self):
         for device_index in range(self.pyaudio_obj.get_device_count()):
             logging.info(
@@ -139,12 +326,7 @@ class AudioInput:
         )
         check_status(status)
 
-        self.input_buffer = in_data
-
-        # TODO adjust MAX_ECHO_BUFFER bsaed on echo time
-        self.output_buffer = deepcopy(self.input_buffer)
-        if self.echo and len(self.echo_buffer) < MAX_ECHO_BUFFER:
-            self.echo_buffer.append((self.input_time, self.output_buffer))
+        self.ring.write(in_data)
 
         return (None, pyaudio.paContinue)
 
@@ -157,10 +339,15 @@ class AudioInput:
         )
         check_status(status)
 
-        if self.output_buffer is not None:
-            output_buffer = self.output_buffer
+        delay = min(
+            int(self.echo_delay_seconds * self.rate / self.frames_per_buffer),
+            RING_FRAMES - 2,
+        )
+        if self.ring.read(self.ring.written - 1 - delay, self.echo_frame):
+            # PyAudio wants bytes
+            output_buffer = self.echo_frame.tobytes()
         else:
-            output_buffer = bytes([0] * frame_count)
+            output_buffer = self.silence
         return (output_buffer, pyaudio.paContinue)
 
     def filter(self, array):
@@ -170,11 +357,29 @@ class AudioInput:
         # Filter both out
         return array[1:-1]
 
-    def update_y(self):
-        if self.input_buffer is not None:
-            array = np.frombuffer(self.input_buffer, dtype=self.np_format)
-            self.y = self.filter(np.abs(np.fft.rfft(array)))
-            self.max_y = max(self.y)
+    def analyse(self):
+        """Publish an Analysis if there are new spectra. Returns how many there were."""
+        new = self.stft.update(self.ring)
+        if not new:
+            return 0
+        for spectrum in self.stft.recent(new):
+            self.recent_peaks.append(self.peaks(self.filter(spectrum))[0])
+
+        y = self.filter(self.stft.latest()).copy()
+        y.flags.writeable = False
+        # The samples of the latest window
+        samples = self.stft.samples / self.full_scale
+        self.analysis.publish(
+            Analysis(
+                spectra=self.stft.spectra,
+                y=y,
+                max_y=max(y.max(), 1e-10),
+                peaks=self.peaks(y),
+                recent_peaks=tuple(self.recent_peaks),
+                rms_level=decibels(np.sqrt(np.mean(samples**2))),
+                peak_level=decibels(np.max(np.abs(samples))),
+            )
+        )
 
         logging.debug(
             "I/O times: %s %s %s/%s/%s",
@@ -184,31 +389,26 @@ class AudioInput:
             self.input_frame_count,
             self.frames_per_buffer,
         )
+        return new
 
-        if self.echo:
-            if self.echo_delay_seconds > 0:
-                oldest_buffer_age = -1
-                if len(self.echo_buffer) > 0:
-                    buffer_time, buffer = self.echo_buffer[0]
-                    oldest_buffer_age = time.time() - buffer_time
-
-                logging.debug(
-                    "Echo buffer: age=%s len=%s",
-                    oldest_buffer_age,
-                    len(self.echo_buffer),
-                )
-
-                if oldest_buffer_age < self.echo_delay_seconds:
-                    self.output_buffer = None
-                else:
-                    _, self.output_buffer = self.echo_buffer.popleft()
+    def analyse_forever(self):
+        # Check for a new window about twice per hop
+        interval = self.stft.hop / self.rate / 2
+        while not self.stopped.is_set():
+            if not self.analyse():
+                self.stopped.wait(interval)
 
     def run(self):
         self.in_stream.start_stream()
         if self.out_stream is not None:
             self.out_stream.start_stream()
+        self.analyser.start()
 
     def shutdown(self):
+        self.stopped.set()
+        if self.analyser.is_alive():
+            self.analyser.join()
+            logging.info("Analysis thread stopped")
         logging.info("Closing audio stream(s)")
         self.in_stream.stop_stream()
         self.in_stream.close()
@@ -218,14 +418,12 @@ class AudioInput:
             self.out_stream.close()
             logging.info("Output audio stream closed")
 
-    def top_magnitudes(self):
-        top = np.argpartition(-self.y, MAX_NOTABLE_FREQUENCIES)[
-            :MAX_NOTABLE_FREQUENCIES
-        ]
-        return sort_notable(top, self.y[top])
+    def top_magnitudes(self, y):
+        top = np.argpartition(-y, MAX_NOTABLE_FREQUENCIES)[:MAX_NOTABLE_FREQUENCIES]
+        return sort_notable(top, y[top])
 
-    def peaks(self):
+    def peaks(self, y):
         top, _ = find_peaks(
-            self.y, height=self.min_y * self.max_y
+            y, height=self.min_y * y.max()
         )  # , distance=len(self.x) // )
-        return sort_notable(top, self.y[top])
+        return sort_notable(top, y[top])
@@ -57,16 +57,23 @@ class MaxFrequenciesText:
             width=window.width,
         )
         self.peaks = (), ()
+        self.levels = ""
 
-    def update(self, dt):
+    def update(self, dt, analysis: audio_input.Analysis):
         if time.time() - self.last_update_time > self.update_period_seconds:
-            self.peaks = self.audio_input.peaks()
+            self.last_update_time = time.time()
+            self.peaks = analysis.peaks
+            self.levels = (
+                f"RMS {analysis.rms_level:0.1f}dBFS, peak {analysis.peak_level:0.1f}dBFS"
+            )
 
     def get_peaks_description(self):
         def hertz(ix):
             return f"{self.audio_input.x[ix]:0.2f}"
 
-        return "\n".join(f"{hertz(ix)}Hz" for ix, y in zip(*self.peaks))
+        return "\n".join(
+            [self.levels] + [f"{hertz(ix)}Hz" for ix, y in zip(*self.peaks)]
+        )
 
     def draw(self):
         self.label.text = self.get_peaks_description()
@@ -92,6 +99,8 @@ class AudioVisualization:
             vis(self.audio_input) for vis in [BarVisualization, Fancy]
         ]
         self.vis = 1
+        # Version of the last Analysis drawn
+        self.version = 0
 
     def next_vis(self):
         self.vis = (self.vis + 1) % len(self.visualizations)
@@ -102,10 +111,14 @@ class AudioVisualization:
             self.vis = len(self.visualizations) - 1
 
     def update(self, dt):
-        self.audio_input.update_y()
-        self.max_freqs.update(dt)
+        # The analysis thread does all the DSP, only take its latest results
+        version, analysis = self.audio_input.analysis.read()
+        if version == self.version:
+            return
+        self.version = version
+        self.max_freqs.update(dt, analysis)
         for vis in self.visualizations:
-            vis.update(dt)
+            vis.update(dt, analysis)
 
     def on_draw(self):
         window.clear()
@@ -156,6 +169,7 @@ class BarVisualization:
 
         self.width = window.width
         self.height = window.height
+        self.max_y = 1
 
         self.bars = [
             pyglet.shapes.Rectangle(
@@ -192,7 +206,7 @@ class BarVisualization:
         )
 
     def map_y(self, y):
-        return 0.9 * window.height * y / self.audio_input.max_y
+        return 0.9 * window.height * y / self.max_y
 
     def map_ix(self, ix):
         hz = self.audio_input.x[ix]
@@ -200,15 +214,15 @@ class BarVisualization:
         # v = math.log10(self.audio_input.max_ix / (1 + ix)) / 2
         return v * window.width
 
-    def update_bars(self):
+    def update_bars(self, y_values):
         width = self.width / len(self.audio_input.x)
-        for ix, (rect, y) in enumerate(zip(self.bars, self.audio_input.y)):
+        for ix, (rect, y) in enumerate(zip(self.bars, y_values)):
             rect.height = self.map_y(y)
             rect.x = self.map_ix(ix)
             rect.width = width
 
-    def update_notable_frequencies(self):
-        ixs, ys = self.audio_input.peaks()
+    def update_notable_frequencies(self, peaks):
+        ixs, ys = peaks
 
         freq_count = 0
         for freq_count, (ix, y, circle) in enumerate(
@@ -226,9 +240,10 @@ class BarVisualization:
         self.label.x = self.width // 2
         self.label.y = self.height - self.label.font_size
 
-    def update(self, dt):
-        self.update_bars()
-        self.update_notable_frequencies()
+    def update(self, dt, analysis: audio_input.Analysis):
+        self.max_y = analysis.max_y
+        self.update_bars(analysis.y)
+        self.update_notable_frequencies(analysis.peaks)
         self.update_labels()
 
     def on_resize(self, width, height):
@@ -251,6 +266,8 @@ class Fancy:
         self.max_ix = len(self.audio_input.x)
 
         self.rows = deque()
+        # Spectra already added as rows
+        self.spectra = 0
 
         self.width = window.width
         self.height = window.height
@@ -304,11 +321,14 @@ class Fancy:
     def map_y(self, y, ix):
         return self.height / self.max_rows * y
 
-    def update(self, dt):
-        peak_ixs, _ = self.audio_input.peaks()
-        self.rows.append(self.get_row(peak_ixs))
-        if len(self.rows) > self.max_rows:
-            self.rows.popleft()
+    def update(self, dt, analysis: audio_input.Analysis):
+        # A row for every hop of the STFT since the last frame
+        new = min(analysis.spectra - self.spectra, len(analysis.recent_peaks))
+        self.spectra = analysis.spectra
+        for peak_ixs in analysis.recent_peaks[len(analysis.recent_peaks) - new :]:
+            self.rows.append(self.get_row(peak_ixs))
+            if len(self.rows) > self.max_rows:
+                self.rows.popleft()
         self.update_squares()
 
     def on_resize(self, width, height):